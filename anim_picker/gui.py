@@ -7,7 +7,9 @@
 import os
 
 import re
-from math import sin, cos, pi
+from array import array
+from math import sin, cos, pi, log
+from functools import partial
 
 from maya import cmds
 from maya import OpenMayaUI
@@ -16,6 +18,8 @@ import anim_picker
 import picker_node
 from handlers import maya_handlers
 from handlers import python_handlers
+from handlers import file_handlers
+from handlers import image_handlers
 
 from handlers import qt_handlers
 from handlers.qt_handlers import QtCore, QtWidgets, QtOpenGL, QtGui
@@ -27,6 +31,29 @@ from handlers import __SELECTION__
 # seems to conflicts with maya viewports...
 __USE_OPENGL__ = False
 
+# Level of detail thresholds, in screen pixels (see get_level_of_detail)
+# Text smaller than this size will not be drawn
+__LOD_TEXT_MIN_SIZE__ = 5.0
+# Polygons smaller than this size will be drawn without antialiasing
+__LOD_ANTIALIAS_MIN_SIZE__ = 16.0
+# Polygons smaller than this size will be drawn as rectangles
+__LOD_RECT_MAX_SIZE__ = 6.0
+
+# Picker items selection states (full state matches legacy True value)
+__SELECTION_NONE__ = 0
+__SELECTION_FULL__ = 1
+__SELECTION_PARTIAL__ = 2
+
+# Picker items render passes (anim mode static layer, see
+# GraphicViewWidget.get_static_layer)
+__RENDER_ALL__ = 0
+__RENDER_BASE__ = 1
+__RENDER_OVERLAY__ = 2
+
+# Background pixmap scale steps per zoom doubling (scaled pixmaps are only
+# built once per step, see get_stepped_size)
+__BACKGROUND_SCALE_STEPS__ = 8
+
 
 # =============================================================================
 # Dependencies ---
@@ -44,6 +71,79 @@ def get_images_folder_path():
     return os.path.join(get_module_path(), "images")
 
 
+def get_level_of_detail(painter):
+    '''
+    Return painter level of detail (screen pixels per item unit),
+    from view scale and items transformations
+    '''
+    transform = painter.worldTransform()
+    return QtWidgets.QStyleOptionGraphicsItem.levelOfDetailFromTransform(
+        transform)
+
+
+def get_device_pixel_ratio(device):
+    '''Return paint device pixel ratio (1.0 without high dpi support)
+    '''
+    if hasattr(device, "devicePixelRatioF"):
+        return device.devicePixelRatioF()
+    if hasattr(device, "devicePixelRatio"):
+        return float(device.devicePixelRatio())
+    return 1.0
+
+
+def skip_render_pass(item):
+    '''
+    Return True if picker item child (polygon, text) is not drawn in
+    current scene render pass (items drawn live are excluded from views
+    static layer, other items are only drawn in static layer)
+    '''
+    scene = item.scene()
+    render_mode = getattr(scene, "render_mode", __RENDER_ALL__)
+    if render_mode == __RENDER_ALL__:
+        return False
+    is_live = item.parentItem() in scene.live_items
+    return is_live == (render_mode == __RENDER_BASE__)
+
+
+def normalize_data(value):
+    '''
+    Return data value in comparable form: numbers as floats, strings as
+    unicode, lists and tuples as lists, and dictionaries as sorted
+    (key, value) lists (data read from files or built from items will
+    compare equal)
+    '''
+    if isinstance(value, dict):
+        return sorted((normalize_data(key), normalize_data(item))
+                      for key, item in value.iteritems())
+    if isinstance(value, (list, tuple)):
+        return [normalize_data(item) for item in value]
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, (int, long, float)):
+        return float(value)
+    if isinstance(value, str):
+        return value.decode("utf-8", "replace")
+    return value
+
+
+def get_stepped_size(size, full_size):
+    '''
+    Return size with scale to full size rounded to background scale steps
+    (capped to full size)
+    '''
+    steps = __BACKGROUND_SCALE_STEPS__
+    scale = 2.0 ** (round(log(float(size) / full_size, 2) * steps) / steps)
+    return max(1, min(full_size, int(round(full_size * scale))))
+
+
+def reset_static_layer(item):
+    '''Static layer of item scene views will be rendered again
+    '''
+    scene = item.scene()
+    if scene and hasattr(scene, "reset_static_layer"):
+        scene.reset_static_layer()
+
+
 # =============================================================================
 # Custom Widgets ---
 # =============================================================================
@@ -338,6 +438,7 @@ class ContextMenuTabWidget(QtWidgets.QTabWidget):
 
         # Update influence name
         self.setTabText(index, name)
+        self.mark_data_changed()
 
     def add_tab_event(self):
         '''Will open dialog to get tab name and create a new tab
@@ -353,6 +454,7 @@ class ContextMenuTabWidget(QtWidgets.QTabWidget):
 
         # Add tab
         self.addTab(GraphicViewWidget(main_window=self.main_window), name)
+        self.mark_data_changed()
 
         # Set new tab active
         self.setCurrentIndex(self.count() - 1)
@@ -375,6 +477,13 @@ class ContextMenuTabWidget(QtWidgets.QTabWidget):
 
         # Remove tab
         self.removeTab(index)
+        self.mark_data_changed()
+
+    def mark_data_changed(self):
+        '''Notify main window of data edits
+        '''
+        if self.main_window and isinstance(self.main_window, MainDockWindow):
+            self.main_window.mark_data_changed()
 
     def get_namespace(self):
         '''Return data_node namespace
@@ -409,7 +518,9 @@ class ContextMenuTabWidget(QtWidgets.QTabWidget):
         return data
 
     def set_data(self, data):
-        '''Will, set/load tabs data
+        '''
+        Will, set/load tabs data
+        (tab content will only be built when the tab is first displayed)
         '''
         self.clear()
         for tab in data:
@@ -421,6 +532,42 @@ class ContextMenuTabWidget(QtWidgets.QTabWidget):
             if tab_content:
                 view.set_data(tab_content)
 
+        # Build current tab content
+        if self.count():
+            self.currentWidget().load_pending_data()
+
+    def update_data(self, data):
+        '''
+        Will update tabs from data, existing tabs views are kept and only
+        changed content is updated (see GraphicViewWidget.update_data)
+        '''
+        # Remove extra tabs
+        while self.count() > len(data):
+            index = self.count() - 1
+            view = self.widget(index)
+            self.removeTab(index)
+            view.deleteLater()
+
+        for index, tab in enumerate(data):
+            name = tab.get('name', 'default')
+            tab_content = tab.get('data', None) or {}
+
+            # Update existing tab
+            if index < self.count():
+                self.setTabText(index, name)
+                self.widget(index).update_data(tab_content)
+                continue
+
+            # Add new tab
+            view = GraphicViewWidget(namespace=self.get_namespace(),
+                                     main_window=self.main_window)
+            self.addTab(view, name)
+            view.set_data(tab_content)
+
+        # Build current tab content
+        if self.count():
+            self.currentWidget().load_pending_data()
+
 
 class BackgroundWidget(QtWidgets.QLabel):
     '''QLabel widget to support background options for tabs.
@@ -490,8 +637,10 @@ class SnapshotWidget(BackgroundWidget):
     '''
 
     def __init__(self,
-                 parent=None):
+                 parent=None,
+                 main_window=None):
         BackgroundWidget.__init__(self, parent)
+        self.main_window = main_window
 
         self.setFixedWidth(80)
         self.setFixedHeight(80)
@@ -521,9 +670,11 @@ class SnapshotWidget(BackgroundWidget):
         else:
             self.background = unicode(path)
 
-        # Load image
-        image = QtGui.QImage(path)
-        self.setPixmap(QtGui.QPixmap.fromImage(image))
+        # Load image (shared cached pixmap)
+        pixmap = image_handlers.get_pixmap(path)
+        if pixmap is None:
+            pixmap = QtGui.QPixmap()
+        self.setPixmap(pixmap)
 
     def contextMenuEvent(self, event):
         '''Right click menu options
@@ -561,12 +712,20 @@ class SnapshotWidget(BackgroundWidget):
 
         # Set picture
         self.set_background(file_name)
+        self.mark_data_changed()
 
     def reset_image(self):
         '''Reset snapshot image to default
         '''
         # Reset background
         self.set_background()
+        self.mark_data_changed()
+
+    def mark_data_changed(self):
+        '''Notify main window of data edits
+        '''
+        if self.main_window and isinstance(self.main_window, MainDockWindow):
+            self.main_window.mark_data_changed()
 
     def get_data(self):
         '''Return snapshot picture path
@@ -1044,6 +1203,25 @@ class OrderedGraphicsScene(QtWidgets.QGraphicsScene):
         self.set_default_size()
         self._z_index = 0
 
+        # Selection feedback data (see update_selection_states)
+        self._control_map = None
+        self._control_map_generation = None
+        self._selected_items = set()
+
+        # Selection generation states were last updated from
+        self._selection_generation = None
+
+        # Current items render pass, and static content generation
+        # (see GraphicViewWidget.get_static_layer)
+        self.render_mode = __RENDER_ALL__
+        self.static_generation = 0
+
+        # Picker items with hover or selection feedback, and items drawn
+        # live over views static layer (see update_live_items)
+        self._overlay_items = set()
+        self.live_items = set()
+        self._live_items_outdated = False
+
     def set_size(self, width, heith):
         '''Will set scene size with proper center position
         '''
@@ -1082,6 +1260,11 @@ class OrderedGraphicsScene(QtWidgets.QGraphicsScene):
         '''
         QtWidgets.QGraphicsScene.clear(self)
         self._z_index = 0
+        self._selected_items = set()
+        self._overlay_items = set()
+        self.live_items = set()
+        self.reset_control_map()
+        self.reset_static_layer()
 
     def set_picker_items(self, items):
         '''Will set picker items
@@ -1109,11 +1292,202 @@ class OrderedGraphicsScene(QtWidgets.QGraphicsScene):
         item.setZValue(self._z_index)
         self._z_index += 1
 
+    def add_picker_items(self, items):
+        '''
+        Add picker items in one batch
+        (scene index is built once all items are added)
+        '''
+        index_method = self.itemIndexMethod()
+        self.setItemIndexMethod(self.NoIndex)
+        try:
+            z_index = self._z_index
+            for item in items:
+                QtWidgets.QGraphicsScene.addItem(self, item)
+                item.setZValue(z_index)
+                z_index += 1
+            self._z_index = z_index
+        finally:
+            self.setItemIndexMethod(index_method)
+
+        self.reset_control_map()
+        self.reset_static_layer()
+
+    def set_picker_items_order(self, items):
+        '''Set picker items z order from list (back to front)
+        '''
+        for z_index, item in enumerate(items):
+            item.setZValue(z_index)
+        self._z_index = len(items)
+
     def addItem(self, item):
         '''Overload to keep axis on top
         '''
         QtWidgets.QGraphicsScene.addItem(self, item)
         self.set_z_value(item)
+        self.reset_control_map()
+        self.reset_static_layer()
+        self.mark_data_changed()
+
+    def removeItem(self, item):
+        '''Overload to reset selection feedback data
+        '''
+        QtWidgets.QGraphicsScene.removeItem(self, item)
+        self._selected_items.discard(item)
+        self._overlay_items.discard(item)
+        self.live_items.discard(item)
+        self.reset_control_map()
+        self.reset_static_layer()
+        self.mark_data_changed()
+
+    def mark_data_changed(self):
+        '''
+        Notify views main window of data edits
+        (items built from data are added in batch, without notification)
+        '''
+        for view in self.views():
+            main_window = getattr(view, "main_window", None)
+            if main_window and isinstance(main_window, MainDockWindow):
+                main_window.mark_data_changed()
+
+    def reset_static_layer(self):
+        '''Views static layer will be rendered again on next paint
+        '''
+        self.static_generation += 1
+        self._live_items_outdated = True
+
+    def set_item_overlay(self, item, state):
+        '''
+        Set picker item hover or selection feedback state
+        (live items will be updated on next paint)
+        '''
+        if bool(state) == (item in self._overlay_items):
+            return
+        if state:
+            self._overlay_items.add(item)
+        else:
+            self._overlay_items.discard(item)
+        self._live_items_outdated = True
+
+    def update_live_items(self):
+        '''
+        Update picker items drawn live over views static layer: items
+        with hover or selection feedback, and items stacked over them
+        (views static layer is rendered again where items changed)
+        '''
+        if not self._live_items_outdated:
+            return
+        self._live_items_outdated = False
+
+        live_items = set()
+        for item in self._overlay_items:
+            live_items.add(item)
+            z_value = item.zValue()
+            rect = item.mapRectToScene(
+                item.boundingRect().united(item.childrenBoundingRect()))
+            for other in self.items(rect,
+                                    QtCore.Qt.IntersectsItemBoundingRect):
+                if not isinstance(other, PickerItem):
+                    other = other.parentItem()
+                if isinstance(other, PickerItem) and \
+                        other.zValue() > z_value:
+                    live_items.add(other)
+
+        changed_items = live_items.symmetric_difference(self.live_items)
+        self.live_items = live_items
+        for item in changed_items:
+            rect = item.mapRectToScene(
+                item.boundingRect().united(item.childrenBoundingRect()))
+            for view in self.views():
+                if isinstance(view, GraphicViewWidget):
+                    view.update_static_layer(rect)
+
+    # =========================================================================
+    # Selection feedback ---
+    def reset_control_map(self):
+        '''Control map will be rebuilt on next selection update
+        '''
+        self._control_map = None
+        self._selection_generation = None
+
+    def get_control_map(self):
+        '''
+        Return node key: [picker items] dictionary, and picker item:
+        resolved controls count dictionary (object sets are flattened)
+        Maps are rebuilt when items, controls, nodes or sets change.
+        '''
+        generation = (__SELECTION__.generation,
+                      maya_handlers.__SET_CACHE__.generation)
+        if (self._control_map is not None and
+                self._control_map_generation == generation):
+            return self._control_map
+
+        control_map = {}
+        counts = {}
+        for item in self.get_picker_items():
+            keys = set(__SELECTION__.get_nodes_keys(item.get_controls()))
+            if not keys:
+                continue
+
+            for key in keys:
+                control_map.setdefault(key, []).append(item)
+            counts[item] = len(keys)
+
+        self._control_map = (control_map, counts)
+        self._control_map_generation = generation
+        return self._control_map
+
+    def set_item_selection_state(self, item, state):
+        '''Set picker item selection state, and track selected items
+        '''
+        item.set_selected_state(state)
+        if state:
+            self._selected_items.add(item)
+        else:
+            self._selected_items.discard(item)
+
+    def update_selection_states(self):
+        '''
+        Update picker items selection state from current selection data
+        (__SELECTION__ should be updated first)
+        Selected nodes are intersected with control map, only previously
+        and currently selected items are updated.
+        '''
+        control_map, counts = self.get_control_map()
+
+        # Count selected controls per item
+        selected = {}
+        for key in __SELECTION__.get_selected_keys():
+            for item in control_map.get(key, ()):
+                selected[item] = selected.get(item, 0) + 1
+
+        # Reset deselected items
+        for item in self._selected_items:
+            if item not in selected:
+                item.set_selected_state(__SELECTION_NONE__)
+
+        # Set selected items state
+        for item, count in selected.items():
+            if count == counts[item]:
+                item.set_selected_state(__SELECTION_FULL__)
+            else:
+                item.set_selected_state(__SELECTION_PARTIAL__)
+
+        self._selected_items = set(selected)
+        self._selection_generation = __SELECTION__.selection_generation
+
+    def is_selection_outdated(self):
+        '''Return True if selection changed since last states update
+        '''
+        return self._selection_generation != \
+            __SELECTION__.selection_generation
+
+    def refresh_selection_states(self):
+        '''Update selection states only if outdated (hidden tabs case)
+        '''
+        if not self.is_selection_outdated():
+            return False
+        self.update_selection_states()
+        return True
 
 
 class GraphicViewWidget(QtWidgets.QGraphicsView):
@@ -1163,9 +1537,28 @@ class GraphicViewWidget(QtWidgets.QGraphicsView):
         # Set background color
         brush = QtGui.QBrush(QtGui.QColor(70, 70, 70, 255))
         self.setBackgroundBrush(brush)
-        self.background_image = None
         self.background_image_path = None
 
+        # Background image size (image itself is only decoded to build
+        # scaled pixmaps, see get_background_pixmap)
+        self.background_size = None
+
+        # Background pixmap scaled to view transform (see drawBackground)
+        self._background_pixmap = None
+        self._background_pixmap_key = None
+
+        # Anim mode static layer (see get_static_layer)
+        self._static_layer = None
+        self._static_layer_key = None
+        self._static_layer_region = QtGui.QRegion()
+        self._rendering_static_layer = False
+
+        # Data to load on first display
+        self._pending_data = None
+
+        # Edit mode state content was built in
+        self._edit_mode = None
+
     def get_center_pos(self):
         return self.mapToScene(QtCore.QPoint(self.width() / 2,
                                              self.height() / 2))
@@ -1318,6 +1711,15 @@ class GraphicViewWidget(QtWidgets.QGraphicsView):
         # Open context menu under mouse
         menu.exec_(self.mapToGlobal(event.pos()))
 
+    def showEvent(self, *args, **kwargs):
+        '''
+        Overload to build pending data content on first display,
+        or update selection states that changed while hidden
+        '''
+        if not self.load_pending_data() and not __EDIT_MODE__.get():
+            self.scene().refresh_selection_states()
+        return QtWidgets.QGraphicsView.showEvent(self, *args, **kwargs)
+
     def resizeEvent(self, *args, **kwargs):
         '''Overload to force scale scene content to fit view
         '''
@@ -1349,6 +1751,19 @@ class GraphicViewWidget(QtWidgets.QGraphicsView):
 
         return ctrl
 
+    def add_picker_items(self, items_data):
+        '''Build PickerItems from data list, and add them to current view
+        '''
+        items = []
+        for data in items_data:
+            item = PickerItem.from_data(data,
+                                        namespace=self.namespace,
+                                        main_window=self.main_window)
+            item.setParent(self)
+            items.append(item)
+        self.scene().add_picker_items(items)
+        return items
+
     def toggle_all_handles_event(self, event=None):
         new_status = None
         for item in self.scene().items():
@@ -1376,6 +1791,7 @@ class GraphicViewWidget(QtWidgets.QGraphicsView):
 
         # Toggle mode
         __EDIT_MODE__.toggle()
+        self.reset_static_layer()
 
         # Reset size to default
         self.main_window.reset_default_size()
@@ -1395,13 +1811,21 @@ class GraphicViewWidget(QtWidgets.QGraphicsView):
 
         self.background_image_path = path
 
-        # Load image and mirror it vertically
-        self.background_image = QtGui.QImage(path).mirrored(False, True)
+        # Read image size only (decode image if format can't tell)
+        size = QtGui.QImageReader(path).size()
+        if not size.isValid():
+            image = image_handlers.get_image(path)
+            if image is None:
+                size = QtCore.QSize(0, 0)
+            else:
+                size = image.size()
+        self.background_size = size
+        self._background_pixmap = None
+        self._background_pixmap_key = None
+        self.reset_static_layer()
 
         # Set scene size to background picture
-        width = self.background_image.width()
-        height = self.background_image.height()
-        self.scene().set_size(width, height)
+        self.scene().set_size(size.width(), size.height())
 
         # Update display
         self.fit_scene_content()
@@ -1425,21 +1849,30 @@ class GraphicViewWidget(QtWidgets.QGraphicsView):
 
         # Set background
         self.set_background(file_path)
+        self.scene().mark_data_changed()
 
     def reset_background_event(self, event=None):
         '''Reset background to default
         '''
-        self.background_image = None
+        self.background_size = None
         self.background_image_path = None
+        self._background_pixmap = None
+        self._background_pixmap_key = None
+        self.reset_static_layer()
         self.scene().set_default_size()
+        self.scene().mark_data_changed()
 
         # Update display
         self.fit_scene_content()
 
     def get_background(self, index):
         '''Return background for tab index
+        (vertically mirrored image, None if view has no background)
         '''
-        return self.background_image
+        if not self.background_image_path:
+            return None
+        return image_handlers.get_image(self.background_image_path,
+                                        mirrored=True)
 
     def clear(self):
         '''Clear view, by replacing scene with a new one
@@ -1447,9 +1880,13 @@ class GraphicViewWidget(QtWidgets.QGraphicsView):
         old_scene = self.scene()
         self.setScene(OrderedGraphicsScene())
         old_scene.deleteLater()
+        self._pending_data = None
+        self.reset_static_layer()
 
     def get_picker_items(self):
-        '''Return scene picker items in proper order (back to front)
+        '''
+        Return scene picker items in proper order (back to front)
+        (Pending data items are not built yet and will be skipped)
         '''
         items = []
         for item in self.scene().items():
@@ -1468,6 +1905,10 @@ class GraphicViewWidget(QtWidgets.QGraphicsView):
     def get_data(self):
         '''Return view data
         '''
+        # Not displayed yet, return data as is
+        if self._pending_data is not None:
+            return self._get_pending_data()
+
         data = {}
 
         # Add background to data
@@ -1484,9 +1925,93 @@ class GraphicViewWidget(QtWidgets.QGraphicsView):
         return data
 
     def set_data(self, data):
-        '''Set/load view data
+        '''
+        Set view data, that will be loaded on first display
+        (data can be a dictionary or a callable returning it)
         '''
         self.clear()
+        self._pending_data = data
+
+        # Load now if already displayed
+        if self.isVisible():
+            self.load_pending_data()
+
+    def update_data(self, data):
+        '''
+        Update view content from data, only items which data changed are
+        built again (other items and view transform are kept).
+        Content not built yet, or built in other mode, is set again.
+        (data can be a dictionary or a callable returning it)
+        '''
+        if (self._pending_data is not None or
+                not self._edit_mode == __EDIT_MODE__.get()):
+            return self.set_data(data)
+
+        if callable(data):
+            data = data() or {}
+
+        # Update background picture
+        background = data.get("background", None)
+        if not background:
+            if self.background_image_path:
+                self.reset_background_event()
+        elif not background == self.background_image_path:
+            self.set_background(background)
+
+        # Sort existing items per data key (changed items have no key)
+        items = self.get_picker_items()
+        items_per_key = {}
+        for item in items:
+            if item.data_key is None:
+                continue
+            items_per_key.setdefault(item.data_key, []).append(item)
+
+        # Match data with existing items, build missing ones
+        ordered_items = []
+        new_items = []
+        for item_data in data.get("items", []):
+            matches = items_per_key.get(PickerItem.get_data_key(item_data))
+            if matches:
+                ordered_items.append(matches.pop(0))
+                continue
+            item = PickerItem.from_data(item_data,
+                                        namespace=self.namespace,
+                                        main_window=self.main_window)
+            item.setParent(self)
+            new_items.append(item)
+            ordered_items.append(item)
+
+        # Remove items that are not in data any more
+        kept_items = set(ordered_items)
+        for item in items:
+            if item not in kept_items:
+                item.remove()
+
+        scene = self.scene()
+        if new_items:
+            scene.add_picker_items(new_items)
+        scene.set_picker_items_order(ordered_items)
+
+        # Nodes may resolve differently with reloaded data
+        scene.reset_control_map()
+        if not __EDIT_MODE__.get():
+            scene.update_selection_states()
+
+    def _get_pending_data(self):
+        '''Return pending data dictionary (from loader if needed)
+        '''
+        if callable(self._pending_data):
+            self._pending_data = self._pending_data() or {}
+        return self._pending_data
+
+    def load_pending_data(self):
+        '''Build view content from pending data
+        '''
+        if self._pending_data is None:
+            return False
+        data = self._get_pending_data()
+        self._pending_data = None
+        self._edit_mode = __EDIT_MODE__.get()
 
         # Set backgraound picture
         background = data.get("background", None)
@@ -1494,27 +2019,195 @@ class GraphicViewWidget(QtWidgets.QGraphicsView):
             self.set_background(background)
 
         # Add items to view
-        for item_data in data.get("items", []):
-            item = self.add_picker_item()
-            item.set_data(item_data)
+        self.add_picker_items(data.get("items", []))
+
+        # Update display
+        self.fit_scene_content()
+
+        # Init selection state from current selection data
+        if not __EDIT_MODE__.get():
+            self.scene().update_selection_states()
+
+        return True
 
     def drawBackground(self, painter, rect):
-        '''Default method override to draw view custom background image
         '''
+        Default method override to draw view custom background image
+        (in anim mode, the cached static layer is drawn instead, and only
+        picker items with hover or selection feedback, and items stacked
+        over them, are drawn live)
+        '''
+        scene = self.scene()
+
+        # Static layer rendering pass
+        if self._rendering_static_layer:
+            scene.render_mode = __RENDER_BASE__
+
+        # Anim mode, draw static layer
+        elif not __EDIT_MODE__.get():
+            layer = self.get_static_layer()
+            if layer is not None:
+                painter.save()
+                painter.resetTransform()
+                painter.drawPixmap(0, 0, layer)
+                painter.restore()
+                scene.render_mode = __RENDER_OVERLAY__
+                return
+
+        # Edit mode, items can change at any time
+        else:
+            scene.render_mode = __RENDER_ALL__
+            self.reset_static_layer()
+
         # Run default method
         result = QtWidgets.QGraphicsView.drawBackground(self, painter, rect)
 
         # Stop here if view has no background
-        if not self.background_image:
+        if self.background_size is None or self.background_size.isEmpty():
             return result
 
-        # Draw background image
-        painter.drawImage(self.sceneRect(),
-                          self.background_image,
-                          QtCore.QRectF(self.background_image.rect()))
+        # Background area in viewport coordinates, and size in device
+        # pixels (high dpi displays)
+        transform = painter.worldTransform()
+        target = transform.mapRect(self.sceneRect())
+        dpr = get_device_pixel_ratio(painter.device())
+        width = int(round(target.width() * dpr))
+        height = int(round(target.height() * dpr))
+        if width < 1 or height < 1:
+            return result
+
+        # Scaled pixmap size, rounded to scale steps (so smooth scaling
+        # doesn't run on each zoom event), full resolution pixmap when
+        # zoomed past image resolution
+        image_width = self.background_size.width()
+        image_height = self.background_size.height()
+        pixmap_width = get_stepped_size(width, image_width)
+        pixmap_height = get_stepped_size(height, image_height)
+
+        # Check for flipped Y axis (view default)
+        flipped = transform.m22() < 0
+        pixmap = self.get_background_pixmap(pixmap_width,
+                                            pixmap_height,
+                                            flipped)
+        if pixmap is None:
+            return result
+
+        # Draw pixmap without transformation (stretched to target size)
+        painter.save()
+        painter.resetTransform()
+        exact = pixmap_width == width and pixmap_height == height
+        if exact and dpr == 1.0:
+            painter.drawPixmap(target.topLeft(), pixmap)
+        else:
+            if not exact:
+                painter.setRenderHint(QtGui.QPainter.SmoothPixmapTransform)
+            painter.drawPixmap(target, pixmap, QtCore.QRectF(pixmap.rect()))
+        painter.restore()
 
         return result
 
+    def get_background_pixmap(self, width, height, flipped=True):
+        '''
+        Return background pixmap at specified size (will only be scaled
+        again on zoom scale steps, resize or background change, and is
+        shared between views using the same image)
+        (flipped: view Y axis is flipped, so image won't be mirrored,
+        None if image can't be loaded)
+        '''
+        key = (width, height, flipped)
+        if self._background_pixmap_key == key:
+            return self._background_pixmap
+
+        pixmap = image_handlers.get_pixmap(self.background_image_path,
+                                           width=width,
+                                           height=height,
+                                           mirrored=not flipped)
+
+        self._background_pixmap = pixmap
+        self._background_pixmap_key = key
+        return pixmap
+
+    def get_static_layer(self):
+        '''
+        Return anim mode static layer pixmap: background and picker items
+        not drawn live, rendered at current view transform (rendered again
+        on resize, zoom or scene content change, and only where live items
+        changed on hover or selection changes)
+        '''
+        scene = self.scene()
+        viewport = self.viewport().rect()
+        if viewport.isEmpty():
+            return None
+
+        # Update live items first, static layer may be rendered again
+        scene.update_live_items()
+
+        # Pixmap is allocated in device pixels (high dpi displays)
+        dpr = get_device_pixel_ratio(self.viewport())
+        transform = self.viewportTransform()
+        key = (viewport.width(),
+               viewport.height(),
+               dpr,
+               transform.m11(),
+               transform.m12(),
+               transform.m21(),
+               transform.m22(),
+               transform.dx(),
+               transform.dy(),
+               scene.static_generation)
+        if self._static_layer_key == key:
+            if not self._static_layer_region.isEmpty():
+                self.render_static_layer(self._static_layer_region)
+            return self._static_layer
+
+        self._static_layer = QtGui.QPixmap(
+            int(round(viewport.width() * dpr)),
+            int(round(viewport.height() * dpr)))
+        if hasattr(self._static_layer, "setDevicePixelRatio"):
+            self._static_layer.setDevicePixelRatio(dpr)
+        self._static_layer_key = key
+        self.render_static_layer(QtGui.QRegion(viewport))
+        return self._static_layer
+
+    def render_static_layer(self, region):
+        '''Render view content to static layer pixmap in region
+        (drawBackground will run the default background drawing)
+        '''
+        rect = region.boundingRect()
+        painter = QtGui.QPainter(self._static_layer)
+        painter.setClipRegion(region)
+        painter.setCompositionMode(QtGui.QPainter.CompositionMode_Source)
+        painter.fillRect(rect, QtCore.Qt.transparent)
+        painter.setCompositionMode(QtGui.QPainter.CompositionMode_SourceOver)
+        painter.setRenderHints(self.renderHints())
+        self._rendering_static_layer = True
+        try:
+            self.render(painter,
+                        QtCore.QRectF(rect),
+                        rect,
+                        QtCore.Qt.IgnoreAspectRatio)
+        finally:
+            self._rendering_static_layer = False
+            self.scene().render_mode = __RENDER_ALL__
+            painter.end()
+        self._static_layer_region = QtGui.QRegion()
+
+    def update_static_layer(self, scene_rect):
+        '''Static layer will be rendered again in scene rectangle area
+        '''
+        if self._static_layer is None:
+            return
+        rect = self.mapFromScene(scene_rect).boundingRect()
+        rect = rect.adjusted(-2, -2, 2, 2)
+        self._static_layer_region = self._static_layer_region.united(rect)
+
+    def reset_static_layer(self):
+        '''Drop static layer pixmap (rendered again on next paint)
+        '''
+        self._static_layer = None
+        self._static_layer_key = None
+        self._static_layer_region = QtGui.QRegion()
+
     def drawForeground(self, painter, rect):
         '''Default method override to draw origin axis in edit mode
         '''
@@ -1557,6 +2250,9 @@ class DefaultPolygon(QtWidgets.QGraphicsObject):
     '''
     __DEFAULT_COLOR__ = QtGui.QColor(0, 0, 0, 255)
 
+    # Bounding rectangle margin for borders drawn over shape outline
+    __PEN_MARGIN__ = 2.0
+
     def __init__(self, parent=None):
         QtWidgets.QGraphicsObject.__init__(self, parent=parent)
 
@@ -1570,6 +2266,10 @@ class DefaultPolygon(QtWidgets.QGraphicsObject):
         # Init default
         self.color = DefaultPolygon.__DEFAULT_COLOR__
 
+        # Cached geometry (see reset_geometry)
+        self._shape = None
+        self._bounding_rect = None
+
     def hoverEnterEvent(self, event=None):
         '''Lightens background color on mose over
         '''
@@ -1589,19 +2289,31 @@ class DefaultPolygon(QtWidgets.QGraphicsObject):
         Needed override:
         Returns the bounding rectangle for the graphic item
         '''
-        return self.shape().boundingRect()
+        if self._bounding_rect is None:
+            margin = self.__PEN_MARGIN__
+            rect = self.shape().boundingRect()
+            self._bounding_rect = rect.adjusted(-margin,
+                                                -margin,
+                                                margin,
+                                                margin)
+        return self._bounding_rect
 
-    def itemChange(self, change, value):
-        '''itemChange update behavior
+    def reset_geometry(self):
+        '''Drop cached shape and bounding rectangle (on geometry change)
         '''
-        # Catch position update
-        if change == self.ItemPositionChange:
-            # Force scene update to prevent "ghosts"
-            # (ghost happen when the previous polygon is out of
-            # the new bounding rect when updating)
-            if self.scene():
-                self.scene().update()
+        self.prepareGeometryChange()
+        self._shape = None
+        self._bounding_rect = None
+        reset_static_layer(self)
 
+    def itemChange(self, change, value):
+        '''
+        itemChange update behavior
+        (no need for full scene updates to prevent "ghosts" on moves,
+        bounding rect includes borders, and shape changes are notified
+        with prepareGeometryChange, so Qt only repaints previous and
+        new item areas)
+        '''
         # Run default action
         return QtWidgets.QGraphicsObject.itemChange(self, change, value)
 
@@ -1623,6 +2335,7 @@ class DefaultPolygon(QtWidgets.QGraphicsObject):
 
         self.color = color
         self.update()
+        reset_static_layer(self)
 
         return color
 
@@ -1639,6 +2352,7 @@ class PointHandle(DefaultPolygon):
         # Make movable
         self.setFlag(self.ItemIsMovable)
         self.setFlag(self.ItemSendsScenePositionChanges)
+        self.setFlag(self.ItemSendsGeometryChanges)
         self.setFlag(self.ItemIgnoresTransformations)
 
         # Set values
@@ -1706,12 +2420,25 @@ class PointHandle(DefaultPolygon):
         '''
         DefaultPolygon.setY(self, value)
 
+    def itemChange(self, change, value):
+        '''Update parent picker item vertex on position change
+        '''
+        if change == self.ItemPositionHasChanged:
+            parent = self.parentItem()
+            if isinstance(parent, PickerItem):
+                parent.update_handle_vertex(self)
+
+        return DefaultPolygon.itemChange(self, change, value)
+
     # =========================================================================
     # Graphic item methods
     # =========================================================================
     def shape(self):
         '''Return default handle square shape based on specified size
         '''
+        if self._shape is not None:
+            return self._shape
+
         path = QtGui.QPainterPath()
         # TODO some ints are being set to negative, make sure it survived the
         # pep8
@@ -1721,6 +2448,8 @@ class PointHandle(DefaultPolygon):
                                                  -self.size / 2.0))
        # path.addRect(rectangle)
         path.addEllipse(rectangle)
+
+        self._shape = path
         return path
 
     def paint(self, painter, options, widget=None):
@@ -1789,29 +2518,97 @@ class Polygon(DefaultPolygon):
     def __init__(self, parent=None, points=[], color=None):
 
         DefaultPolygon.__init__(self, parent=parent)
-        self.points = points
-        self.set_color(Polygon.__DEFAULT_COLOR__)
-
         self._edit_status = False
         self.selected = False
 
+        # Vertices, as flat x, y coordinates array
+        self.vertices = array("d")
+        self.set_points(points)
+        self.set_color(Polygon.__DEFAULT_COLOR__)
+
     def set_edit_status(self, status=False):
         self._edit_status = status
-        self.update()
+
+        # Center cross is drawn in edit status
+        self.reset_geometry()
+
+    # =========================================================================
+    # Vertices ---
+    def get_vertices(self):
+        '''Return vertices (flat x, y coordinates array)
+        '''
+        return self.vertices
+
+    def set_vertices(self, vertices):
+        '''Set vertices from flat x, y coordinates
+        '''
+        self.vertices = array("d", vertices)
+        self.reset_geometry()
+
+    def get_point_count(self):
+        return len(self.vertices) / 2
+
+    def get_points(self):
+        '''Return vertices as [x, y] coordinates list (data format)
+        '''
+        vertices = self.vertices
+        return map(list, zip(vertices[::2], vertices[1::2]))
+
+    def set_points(self, points):
+        '''
+        Set vertices from points
+        (points can be [x, y] coordinates, or objects with x/y methods)
+        '''
+        vertices = array("d")
+        for point in points:
+            if isinstance(point, (list, tuple)):
+                vertices.append(point[0])
+                vertices.append(point[1])
+            elif hasattr(point, 'x') and hasattr(point, 'y'):
+                vertices.append(point.x())
+                vertices.append(point.y())
+        self.vertices = vertices
+        self.reset_geometry()
+
+    def set_vertex(self, index, x=None, y=None):
+        '''Set vertex coordinates (None values are left unchanged)
+        '''
+        if x is not None:
+            self.vertices[index * 2] = x
+        if y is not None:
+            self.vertices[index * 2 + 1] = y
+        self.reset_geometry()
+
+    def mirror_x(self):
+        '''Mirror vertices on X axis
+        '''
+        vertices = self.vertices
+        vertices[::2] = array("d", [-x for x in vertices[::2]])
+        self.reset_geometry()
+
+    def scale(self, x=1.0, y=1.0):
+        '''Scale vertices based on axis x/y factors
+        '''
+        vertices = self.vertices
+        vertices[::2] = array("d", [value * x for value in vertices[::2]])
+        vertices[1::2] = array("d", [value * y for value in vertices[1::2]])
+        self.reset_geometry()
 
     def shape(self):
         '''Override function to return proper "hit box",
-        and compute shape only once.
+        and compute shape only once (until reset_geometry is called).
         '''
+        if self._shape is not None:
+            return self._shape
+
         path = QtGui.QPainterPath()
+        points = self.vertices
 
         # Polygon case
-        if len(self.points) > 2:
+        if len(points) > 4:
             # Define polygon points for closed loop
-            shp_points = []
-            for handle in self.points:
-                shp_points.append(handle.pos())
-            shp_points.append(self.points[0].pos())
+            shp_points = map(QtCore.QPointF, points[::2], points[1::2])
+            shp_points.append(shp_points[0])
 
             # Draw polygon
             polygon = QtGui.QPolygonF(shp_points)
@@ -1820,10 +2617,10 @@ class Polygon(DefaultPolygon):
             path.addPolygon(polygon)
 
         # Circle case
-        else:
-            center = self.points[0].pos()
-            radius = QtGui.QVector2D(self.points[0].pos() -
-                                     self.points[1].pos()).length()
+        elif len(points) == 4:
+            center = QtCore.QPointF(points[0], points[1])
+            radius = QtGui.QVector2D(points[0] - points[2],
+                                     points[1] - points[3]).length()
 
             # Update path
             path.addEllipse(center.x() - radius,
@@ -1831,30 +2628,58 @@ class Polygon(DefaultPolygon):
                             radius * 2,
                             radius * 2)
 
+        self._shape = path
         return path
 
+    def boundingRect(self):
+        '''Override to include center cross in edit status
+        '''
+        if self._bounding_rect is None:
+            rect = DefaultPolygon.boundingRect(self)
+            if self._edit_status:
+                rect = rect.united(QtCore.QRectF(-6, -6, 12, 12))
+            self._bounding_rect = rect
+        return self._bounding_rect
+
     def paint(self, painter, options, widget=None):
         '''Paint graphic item
         '''
-        # Set render quality
-        if __USE_OPENGL__:
-            painter.setRenderHint(QtGui.QPainter.HighQualityAntialiasing)
-        else:
-            painter.setRenderHint(QtGui.QPainter.Antialiasing)
+        # Anim mode render passes (see GraphicViewWidget.get_static_layer)
+        if skip_render_pass(self):
+            return
 
         # Get polygon path
         path = self.shape()
 
+        # Get polygon size on screen, for level of detail
+        rect = path.boundingRect()
+        size = max(rect.width(), rect.height()) * get_level_of_detail(painter)
+
         # Background color
         color = QtGui.QColor(self.color)
         if self._hovered:
             color = color.lighter(130)
-        brush = QtGui.QBrush(color)
 
+        # Tiny polygon, draw as rectangle
+        if size < __LOD_RECT_MAX_SIZE__:
+            painter.fillRect(rect, color)
+            if self.selected:
+                painter.fillRect(rect, QtGui.QColor(255, 255, 255, 50))
+            return
+
+        # Set render quality
+        if size < __LOD_ANTIALIAS_MIN_SIZE__:
+            painter.setRenderHint(QtGui.QPainter.Antialiasing, False)
+        elif __USE_OPENGL__:
+            painter.setRenderHint(QtGui.QPainter.HighQualityAntialiasing)
+        else:
+            painter.setRenderHint(QtGui.QPainter.Antialiasing)
+
+        brush = QtGui.QBrush(color)
         painter.fillPath(path, brush)
 
         # Add white layer color overlay on selected state
-        if self.selected:
+        if self.selected == __SELECTION_FULL__:
             color = QtGui.QColor(255, 255, 255, 50)
             brush = QtGui.QBrush(color)
             painter.fillPath(path, brush)
@@ -1864,6 +2689,9 @@ class Polygon(DefaultPolygon):
         border_pen.setWidthF(1.5)
 
         if self.selected:
+            # Partial selection (some controls only)
+            if self.selected == __SELECTION_PARTIAL__:
+                border_pen.setStyle(QtCore.Qt.DotLine)
             painter.setPen(border_pen)
             painter.drawPath(path)
 
@@ -1883,8 +2711,13 @@ class Polygon(DefaultPolygon):
         painter.drawLine(0, 5, 0, -5)
 
     def set_selected_state(self, state):
-        '''Will set border color feedback based on selection state
         '''
+        Will set border color feedback based on selection state
+        (state: __SELECTION_NONE__, __SELECTION_PARTIAL__ or
+        __SELECTION_FULL__, booleans are supported)
+        '''
+        state = int(state)
+
         # Do nothing on same state
         if state == self.selected:
             return
@@ -1892,6 +2725,32 @@ class Polygon(DefaultPolygon):
         # Change state, and update
         self.selected = state
         self.update()
+        self.update_overlay_state()
+
+    def hoverEnterEvent(self, event=None):
+        '''Overload to draw item live over anim mode static layer
+        '''
+        DefaultPolygon.hoverEnterEvent(self, event)
+        self.update_overlay_state()
+
+    def hoverLeaveEvent(self, event=None):
+        '''Overload to draw item in anim mode static layer again
+        '''
+        DefaultPolygon.hoverLeaveEvent(self, event)
+        self.update_overlay_state()
+
+    def has_overlay(self):
+        '''Return True if hover or selection feedback should be drawn
+        '''
+        return bool(self._hovered or self.selected)
+
+    def update_overlay_state(self):
+        '''Notify scene of parent item hover or selection feedback state
+        '''
+        scene = self.scene()
+        parent = self.parentItem()
+        if parent and hasattr(scene, "set_item_overlay"):
+            scene.set_item_overlay(parent, self.has_overlay())
 
     def set_color(self, color):
         # Run default method
@@ -1958,6 +2817,22 @@ class GraphicText(QtWidgets.QGraphicsSimpleTextItem):
         self.set_size()
         self.set_color(GraphicText.__DEFAULT_COLOR__)
 
+    def paint(self, painter, options, widget=None):
+        '''
+        Overload to skip text too small to be read (level of detail),
+        and text not drawn in current anim mode render pass
+        '''
+        if skip_render_pass(self):
+            return
+
+        size = self.get_size() * get_level_of_detail(painter)
+        if size < __LOD_TEXT_MIN_SIZE__:
+            return
+        QtWidgets.QGraphicsSimpleTextItem.paint(self,
+                                                painter,
+                                                options,
+                                                widget)
+
     def set_text(self, text):
         '''
         Set current text
@@ -1965,6 +2840,7 @@ class GraphicText(QtWidgets.QGraphicsSimpleTextItem):
         '''
         self.setText(text)
         self.center_on_parent()
+        reset_static_layer(self)
 
     def get_text(self):
         '''Return element text
@@ -1978,6 +2854,7 @@ class GraphicText(QtWidgets.QGraphicsSimpleTextItem):
         font.setPointSizeF(value)
         self.setFont(font)
         self.center_on_parent()
+        reset_static_layer(self)
 
     def get_size(self):
         '''Return text pointSizeF
@@ -1997,6 +2874,7 @@ class GraphicText(QtWidgets.QGraphicsSimpleTextItem):
         brush = self.brush()
         brush.setColor(color)
         self.setBrush(brush)
+        reset_static_layer(self)
 
         # Store new color as default color
         GraphicText.__DEFAULT_COLOR__ = color
@@ -2018,7 +2896,8 @@ class PickerItem(DefaultPolygon):
                  parent=None,
                  point_count=4,
                  namespace=None,
-                 main_window=None):
+                 main_window=None,
+                 handles=None):
         DefaultPolygon.__init__(self, parent=parent)
         self.point_count = point_count
 
@@ -2041,9 +2920,12 @@ class PickerItem(DefaultPolygon):
         # Add text
         self.text = GraphicText(parent=self)
 
-        # Add handles
+        # Add vertices (default ones if not specified), stored by polygon
+        # (handles are only built in edit status)
         self.handles = []
-        self.set_handles(self.get_default_handles())
+        if handles is None:
+            handles = self.get_default_handles()
+        self.set_handles(handles)
 
         # Controls vars
         self.controls = []
@@ -2053,22 +2935,75 @@ class PickerItem(DefaultPolygon):
         self.custom_action = False
         self.custom_action_script = None
 
+        # Key of data item was built from (see from_data), reset on change
+        self.data_key = None
+
+    @classmethod
+    def from_data(cls, data, namespace=None, main_window=None):
+        '''
+        Return new picker item built from data dictionary
+        (handles are built from data directly, with no default handles)
+        '''
+        item = cls(namespace=namespace,
+                   main_window=main_window,
+                   handles=data.get("handles"))
+        item.setPos(0, 0)
+        item.set_data(data, with_handles=False)
+        item.data_key = cls.get_data_key(data)
+        return item
+
+    @staticmethod
+    def get_data_key(data):
+        '''
+        Return stable key for picker item data dictionary
+        (equal data will return equal keys, whatever the keys order)
+        '''
+        return repr(normalize_data(data))
+
+    def mark_changed(self):
+        '''
+        Item changed since it was built from data (see from_data),
+        scene views main window will be notified
+        '''
+        self.data_key = None
+        scene = self.scene()
+        if scene and isinstance(scene, OrderedGraphicsScene):
+            scene.mark_data_changed()
+
+    def itemChange(self, change, value):
+        '''Mark item as changed on moves
+        '''
+        if change == self.ItemScenePositionHasChanged:
+            self.mark_changed()
+        return DefaultPolygon.itemChange(self, change, value)
+
     def shape(self):
+        '''Return polygon shape, with handles shapes in edit status
+        (cached until reset_geometry is called)
+        '''
+        if self._shape is not None:
+            return self._shape
+
         path = QtGui.QPainterPath()
 
         if self.polygon:
             path.addPath(self.polygon.shape())
 
-        # Stop here in default mode
-        if not self._edit_status:
-            return path
-
         # Add handles to shape
-        for handle in self.handles:
-            path.addPath(handle.mapToParent(handle.shape()))
+        if self._edit_status:
+            for handle in self.handles:
+                path.addPath(handle.mapToParent(handle.shape()))
 
+        self._shape = path
         return path
 
+    def reset_geometry(self):
+        '''Drop cached geometry for item and polygon
+        '''
+        DefaultPolygon.reset_geometry(self)
+        if self.polygon:
+            self.polygon.reset_geometry()
+
     def paint(self, painter, *args, **kwargs):
         pass
         # for debug only
@@ -2108,13 +3043,13 @@ class PickerItem(DefaultPolygon):
         for i in range(0, self.point_count):
             x = sin(i * angle_step + pi / self.point_count) * unit_scale
             y = cos(i * angle_step + pi / self.point_count) * unit_scale
-            handle = PointHandle(x=x, y=y, parent=self, index=i + 1)
-            handles.append(handle)
+            handles.append([x, y])
 
-        # Circle case
+        # Circle case (center and radius points)
         if len(handles) == 2:
             handles.reverse()
-            handles[0] = handles[0] + (handles[1] - handles[0]) / 2
+            handles[0] = [(handles[0][0] + handles[1][0]) / 2,
+                          (handles[0][1] + handles[1][1]) / 2]
 
         return handles
 
@@ -2131,46 +3066,125 @@ class PickerItem(DefaultPolygon):
         self.set_handles(points)
 
     def get_handles(self):
-        '''Return picker item handles
         '''
+        Return picker item handles
+        (handles are built on demand outside of edit status)
+        '''
+        if not self.handles:
+            self.build_handles()
         return self.handles
 
     def set_handles(self, handles=list()):
-        '''Set polygon handles points
         '''
+        Set polygon handles points
+        (handles can be [x, y] coordinates, or objects with x/y methods)
+        '''
+        # Update polygon vertices
+        self.polygon.set_points(handles)
+        self.mark_changed()
+
         # Remove existing handles
+        self.release_handles()
+        self.reset_geometry()
+
+        # Set new point count
+        self.point_count = self.polygon.get_point_count()
+
+        # Build handles in edit status
+        if self.get_edit_status():
+            self.build_handles()
+
+    def get_vertices(self):
+        '''Return polygon vertices (flat x, y coordinates array)
+        '''
+        return self.polygon.get_vertices()
+
+    def get_points(self):
+        '''Return polygon vertices as [x, y] coordinates list
+        '''
+        return self.polygon.get_points()
+
+    def set_vertices(self, vertices):
+        '''Set polygon vertices from flat x, y coordinates
+        '''
+        self.polygon.set_vertices(vertices)
+        self.update_handles_position()
+
+    def set_vertex_coordinate(self, index, axis=0, value=0):
+        '''Set vertex x (axis 0) or y (axis 1) coordinate
+        '''
+        if axis:
+            self.polygon.set_vertex(index, y=value)
+        else:
+            self.polygon.set_vertex(index, x=value)
+        self.update_handles_position()
+
+    def build_handles(self):
+        '''Build handles graphic items from polygon vertices
+        '''
+        self.release_handles()
+
+        # start index at 1 since table Widget raw are indexed at 1
+        handles = []
+        for i, point in enumerate(self.polygon.get_points()):
+            handle = PointHandle(x=point[0],
+                                 y=point[1],
+                                 parent=self,
+                                 index=i + 1)
+            handle.setVisible(self.get_edit_status())
+            handles.append(handle)
+        self.handles = handles
+        self.reset_geometry()
+
+    def release_handles(self):
+        '''Delete handles graphic items (vertices are kept)
+        '''
+        if not self.handles:
+            return
         for handle in self.handles:
             handle.setParent(None)
             handle.deleteLater()
+        self.handles = []
+        self.reset_geometry()
 
-        # Parse input type
-        new_handles = []
-        # start index at 1 since table Widget raw are indexed at 1
-        index = 1
-        for handle in handles:
-            if isinstance(handle, (list, tuple)):
-                handle = PointHandle(x=handle[0],
-                                     y=handle[1],
-                                     parent=self,
-                                     index=index)
-            elif hasattr(handle, 'x') and hasattr(handle, 'y'):
-                handle = PointHandle(x=handle.x(),
-                                     y=handle.y(),
-                                     parent=self,
-                                     index=index)
-            new_handles.append(handle)
-            index += 1
-
-        # Update handles list
-        self.handles = new_handles
-        self.polygon.points = new_handles
-
-        # Set current visibility status
-        for handle in self.handles:
-            handle.setVisible(self.get_edit_status())
+    def update_handles_position(self):
+        '''
+        Move handles to polygon vertices after vertices changes
+        (handles are built again on point count change)
+        '''
+        self.point_count = self.polygon.get_point_count()
+        self.mark_changed()
 
-        # Set new point count
-        self.point_count = len(self.handles)
+        if not len(self.handles) == self.point_count:
+            if self.handles or self.get_edit_status():
+                self.build_handles()
+            else:
+                self.reset_geometry()
+            return
+
+        vertices = self.polygon.get_vertices()
+        for handle, x, y in zip(self.handles, vertices[::2], vertices[1::2]):
+            handle.setPos(x, y)
+        self.reset_geometry()
+
+    def update_handle_vertex(self, handle):
+        '''Write handle position back to polygon vertex (on handle move)
+        '''
+        try:
+            index = self.handles.index(handle)
+        except ValueError:
+            return
+
+        # Skip handles moved from vertices
+        vertices = self.polygon.get_vertices()
+        x = handle.x()
+        y = handle.y()
+        if vertices[index * 2] == x and vertices[index * 2 + 1] == y:
+            return
+
+        self.polygon.set_vertex(index, x, y)
+        self.reset_geometry()
+        self.mark_changed()
 
     # =========================================================================
     # Mouse events ---
@@ -2457,10 +3471,16 @@ class PickerItem(DefaultPolygon):
         '''
         self._edit_status = status
 
-        for handle in self.handles:
-            handle.setVisible(status)
+        # Handles are only built in edit status
+        if status:
+            self.get_handles()
+            for handle in self.handles:
+                handle.setVisible(status)
+        else:
+            self.release_handles()
 
         self.polygon.set_edit_status(status)
+        self.reset_geometry()
 
     def get_edit_status(self):
         return self._edit_status
@@ -2481,6 +3501,7 @@ class PickerItem(DefaultPolygon):
         '''Set polygon color
         '''
         self.polygon.set_color(color)
+        self.mark_changed()
 
     # =========================================================================
     # Text handling ---
@@ -2489,18 +3510,21 @@ class PickerItem(DefaultPolygon):
 
     def set_text(self, text):
         self.text.set_text(text)
+        self.mark_changed()
 
     def get_text_color(self):
         return self.text.get_color()
 
     def set_text_color(self, color):
         self.text.set_color(color)
+        self.mark_changed()
 
     def get_text_size(self):
         return self.text.get_size()
 
     def set_text_size(self, size):
         self.text.set_size(size)
+        self.mark_changed()
 
     # =========================================================================
     # Scene Placement ---
@@ -2558,8 +3582,8 @@ class PickerItem(DefaultPolygon):
     def mirror_shape(self):
         '''Will mirror polygon handles position on X axis
         '''
-        for handle in self.handles:
-            handle.mirror_x_position()
+        self.polygon.mirror_x()
+        self.update_handles_position()
 
     def mirror_color(self):
         '''Will reverse red/bleu rgb values for the polygon color
@@ -2617,8 +3641,8 @@ class PickerItem(DefaultPolygon):
         '''Will scale shape based on axis x/y factors
         '''
         # Scale handles
-        for handle in self.handles:
-            handle.scale_pos(x, y)
+        self.polygon.scale(x, y)
+        self.update_handles_position()
 
         # Scale position
         if world:
@@ -2634,9 +3658,11 @@ class PickerItem(DefaultPolygon):
 
     def set_custom_action_mode(self, state):
         self.custom_action = state
+        self.mark_changed()
 
     def set_custom_action_script(self, cmd):
         self.custom_action_script = cmd
+        self.mark_changed()
 
     def get_custom_action_script(self):
         return self.custom_action_script
@@ -2648,10 +3674,20 @@ class PickerItem(DefaultPolygon):
         '''
         return self.namespace
 
+    def _reset_scene_control_map(self):
+        '''Reset scene selection feedback data on controls change
+        '''
+        self.mark_changed()
+        scene = self.scene()
+        if scene and isinstance(scene, OrderedGraphicsScene):
+            scene.reset_control_map()
+
     def set_control_list(self, ctrls=list()):
         '''Update associated control list
         '''
-        self.controls = ctrls
+        # Copy list, data can be shared with other items (cached file data)
+        self.controls = list(ctrls)
+        self._reset_scene_control_map()
 
     def get_controls(self, with_namespace=True):
         '''Return associated controls
@@ -2678,6 +3714,7 @@ class PickerItem(DefaultPolygon):
         '''Add control to list
         '''
         self.controls.append(ctrl)
+        self._reset_scene_control_map()
 
     def remove_control(self, ctrl):
         '''Remove control from list
@@ -2685,6 +3722,7 @@ class PickerItem(DefaultPolygon):
         if ctrl not in self.controls:
             return
         self.controls.remove(ctrl)
+        self._reset_scene_control_map()
 
     def search_and_replace_controls(self):
         '''Will search and replace in associated controls names
@@ -2737,20 +3775,32 @@ class PickerItem(DefaultPolygon):
                 continue
             self.append_control(ctrl)
 
-    def is_selected(self):
+    def get_selection_state(self):
         '''
-        Will return True if a related control is currently selected
-        (Only works with polygon that have a single associated maya_node)
+        Return related controls selection state (__SELECTION_NONE__,
+        __SELECTION_PARTIAL__ or __SELECTION_FULL__)
         '''
-        # Get controls associated nodes
-        controls = self.get_controls()
+        # Get controls associated nodes keys
+        keys = __SELECTION__.get_nodes_keys(self.get_controls())
 
-        # Abort if not single control polygon
-        if not len(controls) == 1:
-            return False
+        # Count selected controls
+        count = len(keys)
+        selected_count = 0
+        selected_keys = __SELECTION__.get_selected_keys()
+        for key in keys:
+            if key in selected_keys:
+                selected_count += 1
+
+        if not selected_count:
+            return __SELECTION_NONE__
+        if selected_count == count:
+            return __SELECTION_FULL__
+        return __SELECTION_PARTIAL__
 
-        # Check
-        return __SELECTION__.is_selected(controls[0])
+    def is_selected(self):
+        '''Will return True if all related controls are currently selected
+        '''
+        return self.get_selection_state() == __SELECTION_FULL__
 
     def set_selected_state(self, state):
         '''Will set border color feedback based on selection state
@@ -2760,7 +3810,12 @@ class PickerItem(DefaultPolygon):
     def run_selection_check(self):
         '''Will set selection state based on selection status
         '''
-        self.set_selected_state(self.is_selected())
+        state = self.get_selection_state()
+        scene = self.scene()
+        if scene and isinstance(scene, OrderedGraphicsScene):
+            scene.set_item_selection_state(self, state)
+        else:
+            self.set_selected_state(state)
 
     # =========================================================================
     # Custom menus handling ---
@@ -2768,6 +3823,7 @@ class PickerItem(DefaultPolygon):
         '''Set custom menu list for current poly data
         '''
         self.custom_menus = list(menus)
+        self.mark_changed()
 
     def get_custom_menus(self):
         '''Return current menu list for current poly data
@@ -2776,8 +3832,10 @@ class PickerItem(DefaultPolygon):
 
     # =========================================================================
     # Data handling ---
-    def set_data(self, data):
-        '''Set picker item from data dictionary
+    def set_data(self, data, with_handles=True):
+        '''
+        Set picker item from data dictionary
+        (with_handles: False if handles are already set, see from_data)
         '''
         # Set color
         if "color" in data:
@@ -2790,7 +3848,7 @@ class PickerItem(DefaultPolygon):
             self.setPos(*position)
 
         # Set handles
-        if "handles" in data:
+        if with_handles and "handles" in data:
             self.set_handles(data["handles"])
 
         # Set action mode
@@ -2826,10 +3884,7 @@ class PickerItem(DefaultPolygon):
         data["position"] = [self.x(), self.y()]
 
         # Add handles datas
-        handles_data = []
-        for handle in self.handles:
-            handles_data.append([handle.x(), handle.y()])
-        data["handles"] = handles_data
+        data["handles"] = self.polygon.get_points()
 
         # Add mode data
         if self.get_custom_action_mode():
@@ -2927,24 +3982,29 @@ class HandlesPositionWindow(QtWidgets.QMainWindow):
         if not self.picker_item:
             return
 
-        # Parse handles
-        handles = self.picker_item.get_handles()
-        for i in range(len(handles)):
+        # Parse vertices (handles may not be built outside edit status)
+        callback = self.picker_item.set_vertex_coordinate
+        points = self.picker_item.get_points()
+        for i in range(len(points)):
             self.table.insertRow(i)
-            spin_box = CallBackDoubleSpinBox(callback=handles[i].setX,
-                                             value=handles[i].x(),
-                                             min=-999)
+            spin_box = CallBackDoubleSpinBox(callback=callback,
+                                             value=points[i][0],
+                                             min=-999,
+                                             index=i,
+                                             axis=0)
             self.table.setCellWidget(i, 0, spin_box)
 
-            spin_box = CallBackDoubleSpinBox(callback=handles[i].setY,
-                                             value=handles[i].y(),
-                                             min=-999)
+            spin_box = CallBackDoubleSpinBox(callback=callback,
+                                             value=points[i][1],
+                                             min=-999,
+                                             index=i,
+                                             axis=1)
             self.table.setCellWidget(i, 1, spin_box)
 
     def display_handles_index(self, status=True):
         '''Display related picker handles index
         '''
-        for handle in self.picker_item.get_handles():
+        for handle in self.picker_item.handles:
             handle.enable_index_draw(status)
 
     def closeEvent(self, *args, **kwargs):
@@ -3842,6 +4902,13 @@ class SaveOverlayWidget(OverlayWidget):
 
         self.option_layout.addLayout(file_layout)
 
+        self.binary_option_cb = QtWidgets.QCheckBox()
+        self.binary_option_cb.setText("Binary file format (compact)")
+        self.binary_option_cb.setToolTip("Faster loading and smaller files,"
+                                         " text format can be diffed")
+
+        self.option_layout.addWidget(self.binary_option_cb)
+
     def add_confirmation_buttons(self):
         '''Add save confirmation buttons to overlay
         '''
@@ -3889,6 +4956,10 @@ class SaveOverlayWidget(OverlayWidget):
         if current_file_path:
             self.file_option_cb.setCheckState(QtCore.Qt.Checked)
 
+        # Keep current file format
+        is_binary = file_handlers.is_binary_file(current_file_path)
+        self.binary_option_cb.setChecked(is_binary)
+
     def select_file_event(self):
         '''Open save dialog window to select file path
         '''
@@ -3932,11 +5003,15 @@ class SaveOverlayWidget(OverlayWidget):
         # Get character data
         data = self.parent().get_character_data()
 
-        # Write data to node
+        # Write data to node (data is only marked as saved on success)
         self.data_node.set_data(data)
-        self.data_node.write_data(to_node=self.node_option_cb.checkState(),
-                                  to_file=self.file_option_cb.checkState(),
-                                  file_path=self._get_file_path())
+        status = self.data_node.write_data(
+            to_node=self.node_option_cb.checkState(),
+            to_file=self.file_option_cb.checkState(),
+            file_path=self._get_file_path(),
+            binary=self.binary_option_cb.isChecked())
+        if status:
+            self.parent().mark_data_saved()
 
         # Hide overlay
         self.hide()
@@ -4003,6 +5078,130 @@ class AboutOverlayWidget(OverlayWidget):
         return text
 
 
+# =============================================================================
+# Maya events ---
+# =============================================================================
+class EventHub(object):
+    '''
+    Maya events dispatcher shared by picker windows.
+    Owns a single set of script jobs, parented to one registered window
+    UI (maya removes them with it), reads selection once per (coalesced)
+    selection change and fans events out to registered windows.
+    Script jobs are added again for remaining windows when their parent
+    window is unregistered, and killed with the last window.
+    '''
+    # Selection change events max processing latency (ms)
+    __SELECTION_MAX_LATENCY__ = 100
+
+    def __init__(self):
+        self.windows = []
+        self.script_jobs = []
+        self.script_jobs_parent = None
+        self.selection_events = None
+
+    def register(self, window):
+        '''Add window to events receivers
+        '''
+        if window in self.windows:
+            return
+        self.windows.append(window)
+        self.add_script_jobs()
+
+    def unregister(self, window):
+        '''Remove window from events receivers
+        '''
+        if window in self.windows:
+            self.windows.remove(window)
+
+        # Script jobs parent window is gone, re-parent them
+        if window is self.script_jobs_parent:
+            self.kill_script_jobs()
+            self.add_script_jobs()
+
+        # Last window, stop tracking data nodes and selected nodes
+        if not self.windows:
+            self.kill_script_jobs()
+            picker_node.__REGISTRY__.remove_callbacks()
+            __SELECTION__.remove_callbacks()
+            maya_handlers.__SET_CACHE__.remove_callbacks()
+
+    def add_script_jobs(self):
+        '''
+        Will add maya scripts job events (if not already added),
+        parented to first registered window UI
+        '''
+        if self.script_jobs:
+            return
+
+        # Drop deleted windows
+        self.windows = [window for window in self.windows
+                        if qt_handlers.is_valid(window)]
+        if not self.windows:
+            return
+
+        # Get parent window UI maya name
+        parent = self.windows[0]
+        ui_id = qt_handlers.unwrap_instance(parent)
+        ui_name = OpenMayaUI.MQtUtil.fullName(long(ui_id))
+        self.script_jobs_parent = parent
+
+        # Collapse selection change bursts into single updates
+        if not self.selection_events:
+            self.selection_events = qt_handlers.EventCoalescer(
+                self.selection_change_event,
+                max_latency=self.__SELECTION_MAX_LATENCY__)
+
+        # Add selection change event
+        job_id = cmds.scriptJob(p=ui_name,
+                                cu=True,
+                                kws=False,
+                                e=["SelectionChanged",
+                                   self.selection_events.post])
+        self.script_jobs.append(job_id)
+
+        # Add scene open event
+        job_id = cmds.scriptJob(p=ui_name,
+                                kws=False,
+                                e=["SceneOpened",
+                                   self.scene_opened_event])
+        self.script_jobs.append(job_id)
+
+    def kill_script_jobs(self):
+        '''Will kill script jobs and drop pending events
+        '''
+        for job_id in self.script_jobs:
+            if not cmds.scriptJob(ex=job_id):
+                continue
+            cmds.scriptJob(k=job_id, f=True)
+        self.script_jobs = []
+        self.script_jobs_parent = None
+
+        if self.selection_events:
+            self.selection_events.cancel()
+
+    def _dispatch(self, method_name):
+        '''Call method on registered windows (deleted windows are dropped)
+        '''
+        for window in list(self.windows):
+            # Underlying Qt object was deleted
+            if not qt_handlers.is_valid(window):
+                self.unregister(window)
+                continue
+            getattr(window, method_name)()
+
+    def selection_change_event(self):
+        '''Read selection once, and update windows selection states
+        '''
+        __SELECTION__.update()
+        self._dispatch("update_selection_states")
+
+    def scene_opened_event(self):
+        self.selection_change_event()
+
+
+__EVENT_HUB__ = EventHub()
+
+
 class MainDockWindow(QtWidgets.QDockWidget):
     __OBJ_NAME__ = "ctrl_picker_window"
     __TITLE__ = "Anim Picker"
@@ -4023,7 +5222,14 @@ class MainDockWindow(QtWidgets.QDockWidget):
         # Default vars
         self.childs = []
         self.status = False
-        self.script_jobs = []
+
+        # Loaded data node name (same node loads will only update changes)
+        self.loaded_node = None
+
+        # Edits counter, and counter value when data was last loaded or
+        # saved (see check_for_data_change)
+        self.data_changes = 0
+        self.saved_data_changes = 0
 
         __EDIT_MODE__.set_init(edit)
 
@@ -4148,7 +5354,7 @@ class MainDockWindow(QtWidgets.QDockWidget):
             btns_layout.addWidget(self.save_char_btn)
 
         # Create character picture widget
-        self.pic_widget = SnapshotWidget()
+        self.pic_widget = SnapshotWidget(main_window=self)
         layout.addWidget(self.pic_widget)
 
     def add_tab_widget(self, name="default"):
@@ -4248,20 +5454,31 @@ class MainDockWindow(QtWidgets.QDockWidget):
         '''
         self.load_character()
 
-    def populate_char_selector(self):
-        '''Will populate char selector combo box
+    def populate_char_selector(self, current_node=None):
+        '''
+        Will populate char selector combo box
+        (current_node: data node name to select, first node if not found)
         '''
         # Get char nodes
         nodes = picker_node.get_nodes()
         self.char_selector_cb.nodes = nodes
 
-        # Empty combo box
+        # Empty combo box and populate it, without loading each
+        # intermediate selected character
+        self.char_selector_cb.blockSignals(True)
         self.char_selector_cb.clear()
-
-        # Populate
-        for data_node in nodes:
+        index = 0
+        for i, data_node in enumerate(nodes):
             text = data_node.get_namespace() or data_node.name
             self.char_selector_cb.addItem(text)
+            if data_node.name == current_node:
+                index = i
+        if nodes:
+            self.char_selector_cb.setCurrentIndex(index)
+        self.char_selector_cb.blockSignals(False)
+
+        # Load selected character
+        self.load_character()
 
         # Set elements active status
         self.set_field_status()
@@ -4289,6 +5506,7 @@ class MainDockWindow(QtWidgets.QDockWidget):
         '''
         self.tab_widget.clear()
         self.tab_widget.addTab(GraphicViewWidget(main_window=self), "None")
+        self.loaded_node = None
 
     def refresh(self):
         '''Refresh char selector and window
@@ -4304,20 +5522,14 @@ class MainDockWindow(QtWidgets.QDockWidget):
             if not self.check_for_data_change():
                 return
 
-        # Re-populate selector
-        self.populate_char_selector()
-
-        # Set proper index
-        if current_node:
-            self.make_node_active(current_node)
+        # Re-populate selector, with current node active
+        self.populate_char_selector(current_node)
 
         # Refresh selection check
         self.selection_change_event()
 
-        # Force view resize
-        self.tab_widget.fit_contents()
-
         # Set focus on view
+        # (views are fitted on character change only, see load_character)
         self.tab_widget.currentWidget().setFocus()
 
     def load_from_sel_node(self):
@@ -4327,6 +5539,8 @@ class MainDockWindow(QtWidgets.QDockWidget):
         if not sel:
             return
         data_node = picker_node.get_node_for_object(sel[0])
+        if not data_node:
+            return
         self.make_node_active(data_node.name)
 
     def make_node_active(self, data_node):
@@ -4380,7 +5594,7 @@ class MainDockWindow(QtWidgets.QDockWidget):
             return True
 
         # Return true if no changes were detected
-        if data_node == self.get_character_data():
+        if not self.has_data_changed():
             return True
 
         # Open question window
@@ -4391,6 +5605,21 @@ class MainDockWindow(QtWidgets.QDockWidget):
                                                 buttons=QtWidgets.QMessageBox.No | QtWidgets.QMessageBox.Yes)
         return answer == QtWidgets.QMessageBox.Yes
 
+    def mark_data_changed(self):
+        '''Will increment edits counter (called on data edits)
+        '''
+        self.data_changes += 1
+
+    def mark_data_saved(self):
+        '''Window data now matches data node (on load or save)
+        '''
+        self.saved_data_changes = self.data_changes
+
+    def has_data_changed(self):
+        '''Return True if data was edited since last load or save
+        '''
+        return not self.data_changes == self.saved_data_changes
+
     def get_current_namespace(self):
         return self.get_current_data_node().get_namespace()
 
@@ -4412,26 +5641,40 @@ class MainDockWindow(QtWidgets.QDockWidget):
         data_node = self.get_current_data_node()
         if not data_node:
             return
-        picker_data = data_node.get_data()
+        picker_data = data_node.get_data(load_tabs=False)
+
+        # Same character, only update changed content
+        reload = self.loaded_node == data_node.name
+        self.loaded_node = data_node.name
 
         # Load snapshot
         path = picker_data.get("snapshot", None)
         self.pic_widget.set_background(path)
 
-        # load tabs
-        tabs_data = picker_data.get("tabs", {})
-        self.tab_widget.set_data(tabs_data)
+        # load tabs (content will be decoded and built on first display)
+        tabs_data = []
+        for index in range(data_node.get_tab_count()):
+            tabs_data.append({"name": data_node.get_tab_name(index),
+                              "data": data_node.get_tab_data_loader(index)})
+        if reload:
+            self.tab_widget.update_data(tabs_data)
+        else:
+            self.tab_widget.set_data(tabs_data)
 
         # Default tab
         if not self.tab_widget.count():
             self.tab_widget.addTab(GraphicViewWidget(main_window=self),
                                    "default")
-        else:
+        elif not reload:
             # Return to first tab
             self.tab_widget.setCurrentIndex(0)
 
-        # Fit content
-        self.tab_widget.fit_contents()
+        # Fit content (keep views transform on reload)
+        if not reload:
+            self.tab_widget.fit_contents()
+
+        # Loaded data has no changes
+        self.mark_data_saved()
 
         # Update selection states
         self.selection_change_event()
@@ -4478,43 +5721,18 @@ class MainDockWindow(QtWidgets.QDockWidget):
     # =========================================================================
     # Script jobs handling ---
     def add_script_jobs(self):
-        '''Will add maya scripts job events
+        '''Will register window to shared maya events (see EventHub)
         '''
-        # Clear any existing scrip jobs
-        self.kill_script_jobs()
-
-        # Get current UI maya_name
-        ui_id = qt_handlers.unwrap_instance(self)
-        ui_name = OpenMayaUI.MQtUtil.fullName(long(ui_id))
-
-        # Add selection change event
-        job_id = cmds.scriptJob(p=ui_name,
-                                cu=True,
-                                kws=False,
-                                e=["SelectionChanged",
-                                   self.selection_change_event])
-        self.script_jobs.append(job_id)
-
-        # Add scene open event
-        job_id = cmds.scriptJob(p=ui_name,
-                                kws=False,
-                                e=["SceneOpened",
-                                   self.selection_change_event])
-
-        self.script_jobs.append(job_id)
+        __EVENT_HUB__.register(self)
 
     def kill_script_jobs(self):
-        '''Will kill any associated script job
+        '''Will unregister window from shared maya events
         '''
-        for job_id in self.script_jobs:
-            if not cmds.scriptJob(ex=job_id):
-                continue
-            cmds.scriptJob(k=job_id, f=True)
-        self.script_jobs = []
+        __EVENT_HUB__.unregister(self)
 
     def selection_change_event(self):
         '''
-        Event called with a script job from maya on selection change.
+        Will read current selection, and update selection states.
         Will properly parse poly_ctrls associated node, and set border
         visible if content is selected
         '''
@@ -4525,9 +5743,22 @@ class MainDockWindow(QtWidgets.QDockWidget):
         # Update selection data
         __SELECTION__.update()
 
+        self.update_selection_states()
+
+    def update_selection_states(self):
+        '''
+        Event called from maya selection change (selection data is already
+        updated), will update active tab items selection states
+        (hidden tabs are updated when displayed)
+        '''
+        # Abort in Edit mode
+        if __EDIT_MODE__.get():
+            return
+
         # Update controls for active tab
-        for item in self.get_picker_items():
-            item.run_selection_check()
+        view = self.tab_widget.currentWidget()
+        if view:
+            view.scene().update_selection_states()
 
 
 # =============================================================================
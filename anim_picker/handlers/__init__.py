@@ -5,6 +5,10 @@
 import mode_handlers
 import maya_handlers
 
+# Remove previous selection checker callbacks on module reload
+if "__SELECTION__" in globals():
+    __SELECTION__.remove_callbacks()
+
 # INIT HANDLERS INSTANCES
 __EDIT_MODE__ = mode_handlers.EditMode()
 __SELECTION__ = maya_handlers.SelectionCheck()
@@ -0,0 +1,511 @@
+# Copyright (c) 2018 Guillaume Barlier
+# This file is part of "anim_picker" and covered by MIT,
+# read LICENSE.md and COPYING.md for details.
+
+# Compact binary encoding for picker data
+#
+# Layout (little endian):
+#   magic header, format version (uint16),
+#   lazy values section offset (uint32, version 2+),
+#   string table: byte size (uint32) + nul separated utf-8 strings,
+#   root value,
+#   lazy values section.
+#
+# Values are a type tag byte followed by the value payload. Item colors are
+# packed as 4 bytes, handles as contiguous float64 (or int32) arrays and
+# strings (control names, dictionary keys, etc.) as string table indices.
+#
+# Version 2 stores each tab content in the lazy values section, the root
+# value only keeps their offset and byte size (tab index), so tabs can be
+# decoded on demand.
+#
+# Version 3 stores handles without precision loss (version 2 used float32
+# arrays, still supported for decoding).
+
+import sys
+import struct
+from array import array
+
+MAGIC = "\x89PKR\r\n\x1a\n"
+VERSION = 3
+
+# Value type tags
+_NONE = 0
+_TRUE = 1
+_FALSE = 2
+_INT = 3
+_LONG = 4
+_FLOAT = 5
+_STRING = 6
+_LIST = 7
+_TUPLE = 8
+_DICT = 9
+_COLOR = 10
+_FLOAT32_POINTS = 11
+_FLOATS = 12
+_STRINGS = 13
+_LAZY = 14
+_POINTS = 15
+_INT_POINTS = 16
+_BIG_INT = 17
+
+# Point lists array type codes
+_POINTS_TYPECODES = {_POINTS: "d", _INT_POINTS: "i", _FLOAT32_POINTS: "f"}
+
+_UINT32 = struct.Struct("<I")
+_INT32 = struct.Struct("<i")
+_INT64 = struct.Struct("<q")
+_FLOAT64 = struct.Struct("<d")
+_COLOR_BYTES = struct.Struct("<4B")
+
+_SWAP_BYTES = sys.byteorder == "big"
+
+
+class BinaryFormatError(ValueError):
+    '''Raised when binary data can not be decoded
+    '''
+
+
+def is_binary_data(buffer):
+    '''Return True if buffer starts with the binary format header
+    '''
+    return buffer[:len(MAGIC)] == MAGIC
+
+
+def _to_array(typecode, values):
+    '''Return little endian packed array string
+    '''
+    packed = array(typecode, values)
+    if _SWAP_BYTES:
+        packed.byteswap()
+    return packed.tostring()
+
+
+def _from_array(typecode, buffer, offset, count):
+    '''Return unpacked array and new buffer offset
+    '''
+    values = array(typecode)
+    end = offset + count * values.itemsize
+    if end > len(buffer):
+        raise BinaryFormatError("unexpected end of data")
+    values.fromstring(buffer[offset:end])
+    if _SWAP_BYTES:
+        values.byteswap()
+    return values, end
+
+
+# =============================================================================
+# Encoding ---
+# =============================================================================
+class _LazyContent():
+    '''Value wrapper for content to store in the lazy values section
+    '''
+
+    def __init__(self, value):
+        self.value = value
+
+
+class _Encoder():
+    '''Picker data to binary string encoder
+    '''
+
+    def __init__(self):
+        self.strings = []
+        self.string_indices = {}
+        self.chunks = []
+        self.lazy_chunks = []
+        self.lazy_size = 0
+
+    def string_index(self, value):
+        '''Return string table index for value (add it if needed)
+        '''
+        if isinstance(value, unicode):
+            value = value.encode("utf-8")
+        index = self.string_indices.get(value)
+        if index is None:
+            if "\x00" in value:
+                raise BinaryFormatError("strings can not contain nul bytes")
+            index = len(self.strings)
+            self.strings.append(value)
+            self.string_indices[value] = index
+        return index
+
+    @staticmethod
+    def _is_color(value):
+        if not len(value) == 4:
+            return False
+        for channel in value:
+            if not (type(channel) in (int, long) and 0 <= channel <= 255):
+                return False
+        return True
+
+    @staticmethod
+    def _get_points_type(value):
+        '''Return coordinates type for [x, y] point lists
+        (float or int, None if value is not a point list)
+        '''
+        if not value:
+            return None
+        coord_type = None
+        for point in value:
+            if not (isinstance(point, list) and len(point) == 2):
+                return None
+            for coord in point:
+                if coord_type is None:
+                    coord_type = type(coord)
+                if type(coord) is not coord_type:
+                    return None
+                if coord_type is int and not (
+                        -0x80000000 <= coord <= 0x7fffffff):
+                    return None
+        if coord_type not in (float, int):
+            return None
+        return coord_type
+
+    def encode(self, value):
+        '''Append encoded value to chunks
+        '''
+        chunks = self.chunks
+        value_type = type(value)
+
+        if value is None:
+            chunks.append(chr(_NONE))
+
+        elif value_type is bool:
+            chunks.append(chr(_TRUE if value else _FALSE))
+
+        elif value_type in (int, long):
+            if -0x80000000 <= value <= 0x7fffffff:
+                chunks.append(chr(_INT) + _INT32.pack(value))
+            elif -0x8000000000000000 <= value <= 0x7fffffffffffffff:
+                chunks.append(chr(_LONG) + _INT64.pack(value))
+            else:
+                # Out of int64 range, stored as decimal digits
+                digits = str(value)
+                chunks.append(chr(_BIG_INT) + _UINT32.pack(len(digits)))
+                chunks.append(digits)
+
+        elif value_type is float:
+            chunks.append(chr(_FLOAT) + _FLOAT64.pack(value))
+
+        elif isinstance(value, basestring):
+            index = self.string_index(value)
+            chunks.append(chr(_STRING) + _UINT32.pack(index))
+
+        elif isinstance(value, tuple):
+            # Colors (rgba tuples)
+            if self._is_color(value):
+                chunks.append(chr(_COLOR) + _COLOR_BYTES.pack(*value))
+                return
+            chunks.append(chr(_TUPLE) + _UINT32.pack(len(value)))
+            for item in value:
+                self.encode(item)
+
+        elif isinstance(value, list):
+            # Handles ([x, y] point lists)
+            points_type = self._get_points_type(value)
+            if points_type:
+                coords = []
+                for point in value:
+                    coords.extend(point)
+                if points_type is float:
+                    chunks.append(chr(_POINTS) + _UINT32.pack(len(value)))
+                    chunks.append(_to_array("d", coords))
+                else:
+                    chunks.append(chr(_INT_POINTS) + _UINT32.pack(len(value)))
+                    chunks.append(_to_array("i", coords))
+                return
+
+            # Float lists (positions)
+            if value and all(type(item) is float for item in value):
+                chunks.append(chr(_FLOATS) + _UINT32.pack(len(value)))
+                chunks.append(_to_array("d", value))
+                return
+
+            # String lists (controls)
+            if value and all(isinstance(item, basestring) for item in value):
+                indices = [self.string_index(item) for item in value]
+                chunks.append(chr(_STRINGS) + _UINT32.pack(len(value)))
+                chunks.append(_to_array("I", indices))
+                return
+
+            chunks.append(chr(_LIST) + _UINT32.pack(len(value)))
+            for item in value:
+                self.encode(item)
+
+        elif isinstance(value, dict):
+            chunks.append(chr(_DICT) + _UINT32.pack(len(value)))
+            for key, item in value.iteritems():
+                self.encode(key)
+                self.encode(item)
+
+        elif isinstance(value, _LazyContent):
+            # Encode content apart, and only store its offset and size
+            self.chunks = []
+            try:
+                self.encode(value.value)
+                content = "".join(self.chunks)
+            finally:
+                self.chunks = chunks
+            chunks.append(chr(_LAZY) + _UINT32.pack(self.lazy_size))
+            chunks.append(_UINT32.pack(len(content)))
+            self.lazy_chunks.append(content)
+            self.lazy_size += len(content)
+
+        else:
+            msg = "unsupported data type '{}'".format(value_type.__name__)
+            raise BinaryFormatError(msg)
+
+    def get_string_table(self):
+        '''Return encoded string table
+        '''
+        table = "\x00".join(self.strings)
+        return _UINT32.pack(len(table)) + table
+
+
+def encode_data(data):
+    '''Return binary string for picker data
+    '''
+    # Move tabs content to lazy values section
+    if isinstance(data, dict) and isinstance(data.get("tabs"), list):
+        data = dict(data)
+        tabs = []
+        for tab in data["tabs"]:
+            if isinstance(tab, dict) and "data" in tab:
+                tab = dict(tab)
+                tab["data"] = _LazyContent(tab["data"])
+            tabs.append(tab)
+        data["tabs"] = tabs
+
+    encoder = _Encoder()
+    encoder.encode(data)
+    body = "".join(encoder.chunks)
+    string_table = encoder.get_string_table()
+
+    # Lazy values section offset
+    header_size = len(MAGIC) + 6
+    lazy_offset = header_size + len(string_table) + len(body)
+
+    chunks = [MAGIC,
+              struct.pack("<HI", VERSION, lazy_offset),
+              string_table,
+              body]
+    chunks.extend(encoder.lazy_chunks)
+    return "".join(chunks)
+
+
+# =============================================================================
+# Decoding ---
+# =============================================================================
+class LazyValue():
+    '''Placeholder for encoded value, that will only be decoded
+    on first load call
+    '''
+
+    def __init__(self, decoder, offset, size):
+        self.decoder = decoder
+        self.offset = offset
+        self.size = size
+        self.value = None
+
+    def __repr__(self):
+        return "{}.{}(offset={}, size={})".format(self.__class__.__module__,
+                                                 self.__class__.__name__,
+                                                 self.offset,
+                                                 self.size)
+
+    def is_loaded(self):
+        return self.decoder is None
+
+    def load(self):
+        '''Return decoded value
+        '''
+        if self.decoder:
+            self.value = self.decoder.decode_at(self.offset)
+            self.decoder = None
+        return self.value
+
+
+class _Decoder():
+    '''Binary string to picker data decoder
+    '''
+
+    def __init__(self, buffer, offset=0, lazy=False):
+        self.buffer = buffer
+        self.offset = offset
+        self.strings = []
+        self.lazy = lazy
+        self.lazy_offset = 0
+
+    def read_header(self):
+        '''Check header and return format version
+        '''
+        if not is_binary_data(self.buffer):
+            raise BinaryFormatError("invalid binary picker data header")
+        self.offset = len(MAGIC)
+        version = struct.unpack_from("<H", self.buffer, self.offset)[0]
+        self.offset += 2
+        if version > VERSION:
+            msg = "unsupported binary picker data version {}".format(version)
+            raise BinaryFormatError(msg)
+
+        # Lazy values section
+        if version > 1:
+            self.lazy_offset = self.read_uint32()
+
+        return version
+
+    def read_string_table(self):
+        '''Read string table
+        '''
+        size = self.read_uint32()
+        end = self.offset + size
+        if end > len(self.buffer):
+            raise BinaryFormatError("unexpected end of data")
+        strings = self.buffer[self.offset:end].split("\x00")
+
+        # Keep ascii strings as str (as text data parsing does)
+        for i, string in enumerate(strings):
+            try:
+                string.decode("ascii")
+            except UnicodeDecodeError:
+                strings[i] = string.decode("utf-8")
+        self.strings = strings
+        self.offset = end
+
+    def read_uint32(self):
+        value = _UINT32.unpack_from(self.buffer, self.offset)[0]
+        self.offset += 4
+        return value
+
+    def decode_at(self, offset):
+        '''Return value decoded at specified offset
+        '''
+        current_offset = self.offset
+        self.offset = offset
+        try:
+            return self.decode()
+        except (IndexError, struct.error):
+            raise BinaryFormatError("unexpected end of data")
+        finally:
+            self.offset = current_offset
+
+    def decode(self):
+        '''Return next decoded value
+        '''
+        buffer = self.buffer
+        tag = ord(buffer[self.offset])
+        self.offset += 1
+
+        if tag == _NONE:
+            return None
+
+        elif tag == _TRUE:
+            return True
+
+        elif tag == _FALSE:
+            return False
+
+        elif tag == _INT:
+            value = _INT32.unpack_from(buffer, self.offset)[0]
+            self.offset += 4
+            return value
+
+        elif tag == _LONG:
+            value = _INT64.unpack_from(buffer, self.offset)[0]
+            self.offset += 8
+            return value
+
+        elif tag == _FLOAT:
+            value = _FLOAT64.unpack_from(buffer, self.offset)[0]
+            self.offset += 8
+            return value
+
+        elif tag == _BIG_INT:
+            size = self.read_uint32()
+            end = self.offset + size
+            if end > len(buffer):
+                raise BinaryFormatError("unexpected end of data")
+            try:
+                value = long(buffer[self.offset:end])
+            except ValueError:
+                msg = "invalid integer at offset {}".format(self.offset)
+                raise BinaryFormatError(msg)
+            self.offset = end
+            return value
+
+        elif tag == _STRING:
+            return self.strings[self.read_uint32()]
+
+        elif tag == _COLOR:
+            value = _COLOR_BYTES.unpack_from(buffer, self.offset)
+            self.offset += 4
+            return value
+
+        elif tag in (_POINTS, _INT_POINTS, _FLOAT32_POINTS):
+            count = self.read_uint32()
+            coords, self.offset = _from_array(_POINTS_TYPECODES[tag],
+                                              buffer,
+                                              self.offset,
+                                              count * 2)
+            coords = iter(coords.tolist())
+            return map(list, zip(coords, coords))
+
+        elif tag == _FLOATS:
+            count = self.read_uint32()
+            values, self.offset = _from_array("d", buffer, self.offset, count)
+            return values.tolist()
+
+        elif tag == _STRINGS:
+            count = self.read_uint32()
+            indices, self.offset = _from_array("I",
+                                               buffer,
+                                               self.offset,
+                                               count)
+            strings = self.strings
+            return [strings[index] for index in indices]
+
+        elif tag in (_LIST, _TUPLE):
+            count = self.read_uint32()
+            decode = self.decode
+            value = [decode() for i in xrange(count)]
+            if tag == _TUPLE:
+                return tuple(value)
+            return value
+
+        elif tag == _DICT:
+            count = self.read_uint32()
+            decode = self.decode
+            value = {}
+            for i in xrange(count):
+                key = decode()
+                value[key] = decode()
+            return value
+
+        elif tag == _LAZY:
+            offset = self.lazy_offset + self.read_uint32()
+            size = self.read_uint32()
+            if self.lazy:
+                return LazyValue(self, offset, size)
+            return self.decode_at(offset)
+
+        msg = "invalid value tag {} at offset {}".format(tag, self.offset - 1)
+        raise BinaryFormatError(msg)
+
+
+def decode_data(buffer, lazy=False):
+    '''Return picker data decoded from binary string
+
+    # kwargs:
+    lazy (bool): if True, tabs content will be returned as LazyValue
+    instances to decode on demand
+    '''
+    decoder = _Decoder(buffer, lazy=lazy)
+    try:
+        decoder.read_header()
+        decoder.read_string_table()
+    except struct.error:
+        raise BinaryFormatError("unexpected end of data")
+    except UnicodeDecodeError:
+        raise BinaryFormatError("invalid string table encoding")
+    return decoder.decode_at(decoder.offset)
@@ -3,8 +3,10 @@
 # read LICENSE.md and COPYING.md for details.
 
 import os
-import re
+from collections import OrderedDict
 
+import python_handlers
+import binary_handlers
 from qt_handlers import QtGui, get_maya_window
 
 header_text = '''# Copyright (c) 2018 Guillaume Barlier
@@ -18,6 +20,91 @@ data_start_tag = "<data_start/>"
 data_end_tag = "<data_end/>"
 
 
+class DataCache():
+    '''
+    Process wide parsed picker data cache, entries are keyed on file path,
+    modification time and size, so edited files are parsed again.
+    Least recently used entries are dropped once the cached files size
+    exceed __MAX_SIZE__ (approximate data memory size).
+
+    Cached data is shared between readers and must not be modified in place.
+    '''
+    __MAX_SIZE__ = 64 * 1024 * 1024
+
+    def __init__(self, max_size=None):
+        self.max_size = max_size or self.__MAX_SIZE__
+        self.size = 0
+
+        # path: (mtime, size, data), in use order (most recent last)
+        self.entries = OrderedDict()
+
+    @staticmethod
+    def get_file_key(file_path):
+        '''Return normalized path, modification time and size for file
+        '''
+        path = os.path.normcase(os.path.abspath(file_path))
+        stat = os.stat(path)
+        return path, stat.st_mtime, stat.st_size
+
+    def get(self, file_path):
+        '''Return cached data for file, None if missing or outdated
+        '''
+        try:
+            path, mtime, size = self.get_file_key(file_path)
+        except OSError:
+            return None
+
+        entry = self.entries.pop(path, None)
+        if not entry:
+            return None
+
+        # File changed since cached
+        if entry[:2] != (mtime, size):
+            self.size -= entry[1]
+            return None
+
+        self.entries[path] = entry
+        return entry[2]
+
+    def add(self, file_path, data, key=None):
+        '''Add data to cache for file
+        (key: file key from get_file_key, when read before parsing)
+        '''
+        if key is None:
+            try:
+                key = self.get_file_key(file_path)
+            except OSError:
+                return
+        path, mtime, size = key
+
+        self.invalidate(path)
+        if size > self.max_size:
+            return
+        self.entries[path] = (mtime, size, data)
+        self.size += size
+
+        # Drop least recently used entries
+        while self.size > self.max_size:
+            entry = self.entries.popitem(last=False)[1]
+            self.size -= entry[1]
+
+    def invalidate(self, file_path=None):
+        '''Remove file from cache (all files if None)
+        '''
+        if file_path is None:
+            self.entries.clear()
+            self.size = 0
+            return
+
+        path = os.path.normcase(os.path.abspath(file_path))
+        entry = self.entries.pop(path, None)
+        if entry:
+            self.size -= entry[1]
+
+
+__DATA_CACHE__ = DataCache()
+
+
 def convert_data_to_text(data):
     '''Convert picker data to text data to make it more readable
     '''
@@ -25,38 +112,98 @@ def convert_data_to_text(data):
     return unicode(data)
 
 
-def read_data_file(file_path):
-    '''Read data from file
+def is_binary_file(file_path):
+    '''Return True if file is stored in binary format (from magic header)
+    '''
+    if not (file_path and os.path.isfile(file_path)):
+        return False
+    try:
+        data_file = open(file_path, "rb")
+        try:
+            header = data_file.read(len(binary_handlers.MAGIC))
+        finally:
+            data_file.close()
+    except IOError:
+        return False
+    return binary_handlers.is_binary_data(header)
+
+
+def _load_lazy_tabs(data):
+    '''Decode lazy tabs content in place
+    '''
+    for tab in data.get("tabs", []):
+        content = tab.get("data", None)
+        if isinstance(content, binary_handlers.LazyValue):
+            tab["data"] = content.load()
+    return data
+
+
+def read_data_file(file_path, lazy=False, use_cache=True):
+    '''
+    Read data from file (text or binary format)
+    Parsed data is cached and shared (see DataCache), it should not be
+    modified in place.
+
+    # kwargs:
+    lazy (bool): for binary files, tabs content will be returned as
+    binary_handlers.LazyValue instances, to only decode displayed tabs
+    use_cache (bool): if False, will force file parsing
     '''
     msg = "file path '{}' not found".format(file_path)
     assert os.path.exists(file_path), msg
     msg = "{} does not seem to be a file".format(file_path)
     assert os.path.isfile(file_path), msg
 
+    # Get cached data
+    if use_cache:
+        data = __DATA_CACHE__.get(file_path)
+        if data is not None:
+            if not lazy and isinstance(data, dict):
+                _load_lazy_tabs(data)
+            return data
+
     # Read file
     try:
-        data_file = open(file_path, "r")
+        file_key = DataCache.get_file_key(file_path)
+        data_file = open(file_path, "rb")
         try:
             text_data = data_file.read()
         finally:
             data_file.close()
-    except IOError:
+    except (IOError, OSError):
         # Show error warning
         msg = "Failed to read from file:\n'{}'".format(file_path)
-        QtGui.QMessageBox.warning(get_maya_window(), "Warning", )
+        QtGui.QMessageBox.warning(get_maya_window(), "Warning", msg)
+        return None
+
+    # Binary format (tabs content is always cached undecoded)
+    if binary_handlers.is_binary_data(text_data):
+        data = binary_handlers.decode_data(text_data, lazy=True)
+        if not lazy and isinstance(data, dict):
+            _load_lazy_tabs(data)
 
-    # Get data segment
-    regex_res = re.search(r"(?<=%s)(.*?)(?=%s)" % (data_start_tag,
-                                                   data_end_tag),
-                          text_data,
-                          re.DOTALL)
-    msg = "file '{}' appear to be invalid and is missing the data delimiters"
-    assert regex_res, msg.format(file_path)
+    else:
+        # Get data segment
+        start = text_data.find(data_start_tag)
+        end = text_data.find(data_end_tag, start + 1)
+        msg = "file '{}' appear to be invalid and is missing the data "
+        msg += "delimiters"
+        assert start != -1 and end != -1, msg.format(file_path)
 
-    return eval(regex_res.group())
+        # Parse data literals
+        start += len(data_start_tag)
+        data = python_handlers.safe_literal_eval(text_data,
+                                                 start=start,
+                                                 end=end,
+                                                 filename=file_path)
 
+    # Cache parsed data
+    __DATA_CACHE__.add(file_path, data, key=file_key)
 
-def write_data_file(file_path=None, data={}, f=False):
+    return data
+
+
+def write_data_file(file_path=None, data={}, f=False, binary=None):
     '''Write data to file
 
     # kwargs:
@@ -64,25 +211,44 @@ def write_data_file(file_path=None, data={}, f=False):
     data: the data to write
     f (bool): force write mode, if false, will ask for confirmation when
     overwriting existing files
+    binary (bool): write compact binary format rather than text,
+    if None, will keep existing file format (text for new files)
     '''
     # Ask for confirmation on existing file
     if not f and os.path.exists(file_path):
         # to do
         pass
 
+    # Keep existing file format by default
+    if binary is None:
+        binary = is_binary_file(file_path)
+
+    # Drop cached data
+    __DATA_CACHE__.invalidate(file_path)
+
     # write file
     status = False
     try:
-        # Open file in write mode
-        data_file = open(file_path, "w")
-        try:
-            data_file.write(header_text)
-            data_file.write("\n{}\n".format(data_start_tag))
-            data_file.write(convert_data_to_text(data))
-            data_file.write("\n{}\n".format(data_end_tag))
-            status = True
-        finally:
-            data_file.close()
+        # Binary format
+        if binary:
+            data_file = open(file_path, "wb")
+            try:
+                data_file.write(binary_handlers.encode_data(data))
+                status = True
+            finally:
+                data_file.close()
+
+        # Text format
+        else:
+            data_file = open(file_path, "w")
+            try:
+                data_file.write(header_text)
+                data_file.write("\n{}\n".format(data_start_tag))
+                data_file.write(convert_data_to_text(data))
+                data_file.write("\n{}\n".format(data_end_tag))
+                status = True
+            finally:
+                data_file.close()
     except IOError:
         # Show error warning
         msg = "Failed to write to file:\n'{}'".format(file_path)
@@ -0,0 +1,175 @@
+# Copyright (c) 2018 Guillaume Barlier
+# This file is part of "anim_picker" and covered by MIT,
+# read LICENSE.md and COPYING.md for details.
+
+import os
+from collections import OrderedDict
+
+from qt_handlers import QtCore, QtGui
+
+
+class ImageCache():
+    '''
+    Process wide image assets cache.
+    Entries are keyed on image path and modification time (edited images
+    are loaded again), and hold image variants: decoded and mirrored
+    QImages, scaled QPixmaps.
+    Least recently used images are dropped once variants total byte size
+    exceed __MAX_SIZE__.
+    '''
+    __MAX_SIZE__ = 256 * 1024 * 1024
+
+    def __init__(self, max_size=None):
+        self.max_size = max_size or self.__MAX_SIZE__
+        self.size = 0
+
+        # path: [mtime, {variant key: QImage/QPixmap}, byte size],
+        # in use order (most recent last)
+        self.entries = OrderedDict()
+
+    @staticmethod
+    def get_path_key(path):
+        '''Return normalized path and modification time, None if missing
+        '''
+        path = os.path.normcase(os.path.abspath(unicode(path)))
+        try:
+            return path, os.path.getmtime(path)
+        except OSError:
+            return None
+
+    @staticmethod
+    def get_byte_size(variant):
+        '''Return QImage/QPixmap approximate byte size
+        '''
+        return variant.width() * variant.height() * variant.depth() / 8
+
+    def _get_entry(self, path):
+        '''Return up to date cache entry for path (create it if needed)
+        '''
+        key = self.get_path_key(path)
+        if not key:
+            return None
+        path, mtime = key
+
+        entry = self.entries.pop(path, None)
+        if entry and not entry[0] == mtime:
+            self.size -= entry[2]
+            entry = None
+        if not entry:
+            entry = [mtime, {}, 0]
+        self.entries[path] = entry
+        return entry
+
+    def _add_variant(self, entry, key, variant):
+        '''Store variant and drop least recently used entries if needed
+        '''
+        size = self.get_byte_size(variant)
+        entry[1][key] = variant
+        entry[2] += size
+        self.size += size
+
+        while self.size > self.max_size and len(self.entries) > 1:
+            path, old_entry = self.entries.popitem(last=False)
+            if old_entry is entry:
+                # Keep current entry (most recent last)
+                self.entries[path] = entry
+                continue
+            self.size -= old_entry[2]
+
+        # Still over budget, drop other scaled variants of current image
+        if self.size > self.max_size:
+            for old_key in entry[1].keys():
+                if old_key == key or not old_key[0] == "pixmap":
+                    continue
+                size = self.get_byte_size(entry[1].pop(old_key))
+                entry[2] -= size
+                self.size -= size
+
+    def get_image(self, path, mirrored=False):
+        '''
+        Return decoded QImage for path, None if image can't be loaded
+        (mirrored: vertically mirrored variant)
+        '''
+        entry = self._get_entry(path)
+        if entry is None:
+            return None
+
+        key = ("image", mirrored)
+        image = entry[1].get(key)
+        if image is not None:
+            return image
+
+        # Mirrored variant is built from base image, which is only reused
+        # if already cached (not stored otherwise)
+        image = None
+        if mirrored:
+            image = entry[1].get(("image", False))
+        if image is None:
+            image = QtGui.QImage(unicode(path))
+            if image.isNull():
+                return None
+        if mirrored:
+            image = image.mirrored(False, True)
+
+        self._add_variant(entry, key, image)
+        return image
+
+    def get_pixmap(self, path, width=None, height=None, mirrored=False):
+        '''
+        Return QPixmap for path, scaled to width and height if specified,
+        None if image can't be loaded
+        (mirrored: vertically mirrored variant)
+        '''
+        entry = self._get_entry(path)
+        if entry is None:
+            return None
+
+        key = ("pixmap", width, height, mirrored)
+        pixmap = entry[1].get(key)
+        if pixmap is not None:
+            return pixmap
+
+        image = self.get_image(path, mirrored=mirrored)
+        if image is None:
+            return None
+        if width and height and not (image.width() == width and
+                                     image.height() == height):
+            image = image.scaled(width,
+                                 height,
+                                 QtCore.Qt.IgnoreAspectRatio,
+                                 QtCore.Qt.SmoothTransformation)
+        pixmap = QtGui.QPixmap.fromImage(image)
+
+        self._add_variant(entry, key, pixmap)
+        return pixmap
+
+    def invalidate(self, path=None):
+        '''Remove image from cache (all images if None)
+        '''
+        if path is None:
+            self.entries.clear()
+            self.size = 0
+            return
+
+        path = os.path.normcase(os.path.abspath(unicode(path)))
+        entry = self.entries.pop(path, None)
+        if entry:
+            self.size -= entry[2]
+
+
+__IMAGE_CACHE__ = ImageCache()
+
+
+def get_image(path, mirrored=False):
+    '''Return cached QImage for path (see ImageCache.get_image)
+    '''
+    return __IMAGE_CACHE__.get_image(path, mirrored=mirrored)
+
+
+def get_pixmap(path, width=None, height=None, mirrored=False):
+    '''Return cached QPixmap for path (see ImageCache.get_pixmap)
+    '''
+    return __IMAGE_CACHE__.get_pixmap(path,
+                                      width=width,
+                                      height=height,
+                                      mirrored=mirrored)
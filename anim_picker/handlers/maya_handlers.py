@@ -3,59 +3,259 @@
 # read LICENSE.md and COPYING.md for details.
 
 import sys
+from collections import namedtuple
+from collections import OrderedDict
 from maya import cmds
 from maya import OpenMaya
 
 
-def get_flattened_nodes(nodes):
-    '''Will 'flatten' sets to get all nodes
+# Resolved node (handle is an OpenMaya.MObjectHandle, None for missing nodes)
+NodeInfo = namedtuple("NodeInfo", ["name", "exists", "type", "handle"])
+
+
+def resolve_nodes(nodes):
+    '''
+    Return NodeInfo list for node names (in same order), resolved with
+    the API in a single pass, rather than objExists/nodeType commands
+    for each node.
     '''
-    # Init results
     results = []
-
-    # Parse nodes
+    sel = OpenMaya.MSelectionList()
     for node in nodes or []:
-        # Skip if not doesn't exists
-        if not cmds.objExists(node):
+        # Missing node (or invalid name)
+        sel.clear()
+        try:
+            sel.add(node)
+        except RuntimeError:
+            results.append(NodeInfo(node, False, None, None))
             continue
 
-        # Object set type
-        if cmds.nodeType(node) == "objectSet":
-            content = cmds.sets(node, q=True, no=True)
-            set_nodes = get_flattened_nodes(content)
+        # Non unique name or pattern
+        if not sel.length() == 1:
+            results.append(NodeInfo(node, False, None, None))
+            continue
+
+        mobject = OpenMaya.MObject()
+        sel.getDependNode(0, mobject)
+        node_type = OpenMaya.MFnDependencyNode(mobject).typeName()
+        results.append(NodeInfo(node,
+                                True,
+                                node_type,
+                                OpenMaya.MObjectHandle(mobject)))
+
+    return results
+
+
+class SetContentCache():
+    '''
+    Flattened object sets content cache.
+    Entries are dropped when any cached set members are modified, or when
+    nodes named as their members are renamed (content is stored as
+    names), and all entries on scene open/new or reference load, the
+    generation counter is increased each time entries are dropped, for
+    dependent caches.
+    '''
+
+    def __init__(self):
+        # Set MObjectHandle hash code: (MObjectHandle, flattened members)
+        self.entries = {}
+        self.generation = 0
+
+        # Member name (dag path component): sets hash codes
+        self.name_index = {}
 
-            for set_node in set_nodes:
-                if set_node in results:
-                    continue
-                results.append(set_node)
+        # Node names and scene callbacks ids
+        self.callback_ids = []
+
+        # Set hash code: (MObjectHandle, set members modified callback id)
+        self.set_callbacks = {}
+
+    def _add_callbacks(self, key, handle):
+        '''Register set members, node names and scene callbacks
+        '''
+        if not self.callback_ids:
+            self.callback_ids.append(
+                OpenMaya.MNodeMessage.addNameChangedCallback(
+                    OpenMaya.MObject(), self._renamed_cb))
+            for message in [OpenMaya.MSceneMessage.kAfterOpen,
+                            OpenMaya.MSceneMessage.kAfterNew,
+                            OpenMaya.MSceneMessage.kAfterCreateReference,
+                            OpenMaya.MSceneMessage.kAfterLoadReference]:
+                self.callback_ids.append(
+                    OpenMaya.MSceneMessage.addCallback(message,
+                                                       self._scene_changed_cb))
+
+        # Set already watched (hash code may be reused by a new set)
+        set_callback = self.set_callbacks.get(key)
+        if set_callback:
+            if set_callback[0].isValid() and set_callback[0] == handle:
+                return
+            self._remove_set_callback(key)
+
+        self.set_callbacks[key] = (
+            handle,
+            OpenMaya.MObjectSetMessage.addSetMembersModifiedCallback(
+                handle.object(), self._reset_cb))
+
+    def _remove_set_callback(self, key):
+        '''Remove set members modified callback for set hash code
+        '''
+        set_callback = self.set_callbacks.pop(key, None)
+        if not set_callback:
+            return
+        try:
+            OpenMaya.MMessage.removeCallback(set_callback[1])
+        except RuntimeError:
+            pass
+
+    def remove_callbacks(self):
+        '''Remove registered maya callbacks (cache will be dropped)
+        '''
+        for callback_id in self.callback_ids:
+            try:
+                OpenMaya.MMessage.removeCallback(callback_id)
+            except RuntimeError:
+                pass
+        self.callback_ids = []
+        self.reset()
+
+    def _reset_cb(self, *args):
+        if self.entries:
+            self.reset()
+
+    def _scene_changed_cb(self, *args):
+        self.reset()
+
+    def _renamed_cb(self, mobject, old_name, *args):
+        if self.entries:
+            self.drop_names(old_name)
+            self.drop_names(OpenMaya.MFnDependencyNode(mobject).name())
+
+    def drop_names(self, name):
+        '''
+        Drop cached sets with members using node name (as dag path
+        component), return True if any set was dropped
+        '''
+        dropped = False
+        for key in self.name_index.pop(name, ()):
+            if self.entries.pop(key, None) is not None:
+                dropped = True
+
+        if dropped:
+            self.generation += 1
+        return dropped
+
+    def reset(self):
+        '''Drop cached content
+        '''
+        for key in self.set_callbacks.keys():
+            self._remove_set_callback(key)
+        self.entries = {}
+        self.name_index = {}
+        self.generation += 1
+
+    def get_members(self, info, visited=None):
+        '''
+        Return flattened members names for object set NodeInfo
+        (nested sets are expanded)
+        '''
+        key = info.handle.hashCode()
+        entry = self.entries.get(key)
+        if entry:
+            if entry[0].isValid() and entry[0] == info.handle:
+                return entry[1]
+
+            # Deleted set (or other set reusing hash code)
+            del self.entries[key]
+            if not entry[0].isValid():
+                self._remove_set_callback(key)
+
+        # Guard against sets cycles (None flags a cycle in visited sets)
+        is_root = visited is None
+        if is_root:
+            visited = set()
+        if key in visited:
+            visited.add(None)
+            return ()
+        visited.add(key)
+
+        content = cmds.sets(info.name, q=True, no=True) or []
+        members = tuple(_flatten_nodes(content, visited))
+
+        # Nested sets content is partial if a cycle was found, only the
+        # traversal root content is complete
+        if not is_root and None in visited:
+            return members
+
+        self.entries[key] = (info.handle, members)
+        for member in members:
+            for name in member.split("|"):
+                if name:
+                    self.name_index.setdefault(name, set()).add(key)
+        self._add_callbacks(key, info.handle)
+        return members
+
+
+# Remove previous cache callbacks on module reload
+if "__SET_CACHE__" in globals():
+    __SET_CACHE__.remove_callbacks()
+
+__SET_CACHE__ = SetContentCache()
+
+
+def _flatten_nodes(nodes, visited=None, missing=None):
+    '''
+    Return flattened nodes ordered dictionary keys
+    (missing: list extended with non existing nodes names)
+    '''
+    results = OrderedDict()
+    for info in resolve_nodes(nodes):
+        # Skip if not doesn't exists
+        if not info.exists:
+            if missing is not None:
+                missing.append(info.name)
+            continue
 
+        # Object set type
+        if info.type == "objectSet":
+            for node in __SET_CACHE__.get_members(info, visited=visited):
+                results[node] = None
             continue
 
-        # Append not to results
-        results.append(node)
+        results[info.name] = None
 
     return results
 
 
+def get_flattened_nodes(nodes, missing=None):
+    '''
+    Will 'flatten' sets to get all nodes
+    (without duplicates, in first occurrence order, missing: list extended
+    with non existing nodes names)
+    '''
+    return list(_flatten_nodes(nodes, missing=missing))
+
+
 def select_nodes(nodes, namespace=None, modifier=None):
     '''Select maya node handler with specific modifier behavior
     '''
+    # Add namespace to node names
+    if namespace:
+        nodes = ["{}:{}".format(namespace, node) for node in nodes]
+
     # Parse nodes
     filtered_nodes = []
-    for node in nodes:
-        # Add namespace to node name
-        if namespace:
-            node = "{}:{}".format(namespace, node)
+    for info in resolve_nodes(nodes):
+        node = info.name
 
         # skip invalid nodes
-        if not cmds.objExists(node):
+        if not info.exists:
             sys.stderr.write("node '{}' not found, skipping\n".format(node))
             continue
 
         # Set case
-        if cmds.nodeType(node) == "objectSet":
-            content = get_flattened_nodes([node])
-            filtered_nodes.extend(content)
+        if info.type == "objectSet":
+            filtered_nodes.extend(__SET_CACHE__.get_members(info))
             continue
 
         filtered_nodes.append(node)
@@ -131,8 +331,115 @@ def reset_node_attributes(node, attr="rigBindPose"):
 
 
 class SelectionCheck():
+    '''
+    Selection state checker, nodes are resolved once and cached by name
+    as (MObjectHandle, MDagPath), cached and missing nodes are checked
+    again once nodes with a matching name are renamed or created, and
+    all nodes are dropped on scene open/new or reference load.
+    Node keys are MObjectHandle hash codes (with handle comparison for
+    colliding hash codes), active selection is stored as MObjectHandle
+    list and resolved to node keys on demand, the generation counter is
+    increased when node keys may have changed, for dependent caches, and
+    the selection generation on each selection update.
+    '''
+
     def __init__(self):
         self.sel = OpenMaya.MSelectionList()
+        self.selected_handles = []
+        self._selected_keys = None
+        self.generation = 0
+        self.selection_generation = 0
+
+        # Node name: (MObjectHandle, MDagPath or None for non dag nodes)
+        self.nodes = {}
+
+        # Missing nodes names
+        self.missing = set()
+
+        # Node name (dag path component): cached or missing nodes names
+        self.name_index = {}
+
+        # Node hash code: MObjectHandle list (see get_node_key)
+        self.key_handles = {}
+
+        self.callback_ids = []
+
+    def _add_callbacks(self):
+        '''Register callbacks to invalidate cached nodes
+        '''
+        if self.callback_ids:
+            return
+        self.callback_ids.append(
+            OpenMaya.MNodeMessage.addNameChangedCallback(OpenMaya.MObject(),
+                                                         self._renamed_cb))
+        self.callback_ids.append(
+            OpenMaya.MDGMessage.addNodeAddedCallback(self._added_cb,
+                                                     "dependNode"))
+        for message in [OpenMaya.MSceneMessage.kAfterOpen,
+                        OpenMaya.MSceneMessage.kAfterNew,
+                        OpenMaya.MSceneMessage.kAfterCreateReference,
+                        OpenMaya.MSceneMessage.kAfterLoadReference]:
+            self.callback_ids.append(
+                OpenMaya.MSceneMessage.addCallback(message,
+                                                   self._scene_changed_cb))
+
+    def _renamed_cb(self, mobject, old_name, *args):
+        if self.name_index:
+            self.drop_names(old_name)
+            self.drop_names(OpenMaya.MFnDependencyNode(mobject).name())
+
+    def _added_cb(self, mobject, *args):
+        if self.missing:
+            name = OpenMaya.MFnDependencyNode(mobject).name()
+            self.drop_names(name)
+
+    def _scene_changed_cb(self, *args):
+        self.clear_cache()
+
+    def remove_callbacks(self):
+        '''Remove registered maya callbacks (cache will be dropped)
+        '''
+        for callback_id in self.callback_ids:
+            try:
+                OpenMaya.MMessage.removeCallback(callback_id)
+            except RuntimeError:
+                pass
+        self.callback_ids = []
+        self.clear_cache()
+
+    def clear_cache(self):
+        '''Drop cached nodes
+        '''
+        self.nodes = {}
+        self.missing = set()
+        self.name_index = {}
+        self.key_handles = {}
+        self._selected_keys = None
+        self.generation += 1
+
+    def _index_name(self, node):
+        '''Add cached or missing node name to name index
+        '''
+        for name in node.split("|"):
+            if name:
+                self.name_index.setdefault(name, set()).add(node)
+
+    def drop_names(self, name):
+        '''
+        Drop cached and missing nodes names using node name (as dag path
+        component), return True if any name was dropped
+        '''
+        dropped = False
+        for node in self.name_index.pop(name, ()):
+            if self.nodes.pop(node, None) is not None:
+                dropped = True
+            if node in self.missing:
+                self.missing.discard(node)
+                dropped = True
+
+        if dropped:
+            self.generation += 1
+        return dropped
 
     def update(self):
         '''Will update selection data
@@ -141,6 +448,30 @@ class SelectionCheck():
         self.sel.clear()
         OpenMaya.MGlobal.getActiveSelectionList(self.sel)
 
+        # Get selected nodes handles (keys are resolved on demand)
+        handles = []
+        mobject = OpenMaya.MObject()
+        for i in xrange(self.sel.length()):
+            self.sel.getDependNode(i, mobject)
+            handles.append(OpenMaya.MObjectHandle(mobject))
+        self.selected_handles = handles
+        self._selected_keys = None
+        self.selection_generation += 1
+
+    def get_selected_keys(self):
+        '''
+        Return selected nodes keys set
+        (selected nodes without key, see get_node_key, are skipped)
+        '''
+        if self._selected_keys is None:
+            keys = set()
+            for handle in self.selected_handles:
+                key = self._get_key(handle)
+                if key is not None:
+                    keys.add(key)
+            self._selected_keys = keys
+        return self._selected_keys
+
     @staticmethod
     def get_node_mobject(node):
         '''Will return node mobject if possible
@@ -172,13 +503,107 @@ class SelectionCheck():
 
         return OpenMaya.MDagPath.getAPathTo(mobject)
 
+    def get_node_entry(self, node):
+        '''Return cached (MObjectHandle, MDagPath) for node name
+        '''
+        # Cached node
+        entry = self.nodes.get(node)
+        if entry:
+            handle, dag_path = entry
+            if handle.isValid() and handle.isAlive() and \
+                    (dag_path is None or dag_path.isValid()):
+                return entry
+            del self.nodes[node]
+
+        elif node in self.missing:
+            return None
+
+        self._add_callbacks()
+
+        # Resolve node
+        info = resolve_nodes([node])[0]
+        self._index_name(node)
+        if not info.exists:
+            self.missing.add(node)
+            return None
+
+        mobject = info.handle.object()
+        dag_path = None
+        if mobject.hasFn(OpenMaya.MFn.kDagNode):
+            dag_path = OpenMaya.MDagPath.getAPathTo(mobject)
+
+        entry = (info.handle, dag_path)
+        self.nodes[node] = entry
+        return entry
+
+    def _get_key(self, handle, add=False):
+        '''
+        Return node key for MObjectHandle, None if node has no key
+        (add: register node key if needed)
+        '''
+        code = handle.hashCode()
+        handles = self.key_handles.get(code)
+        if handles is None:
+            if not add:
+                return None
+            handles = self.key_handles[code] = []
+
+        # Colliding hash codes, compare handles
+        for index, other in enumerate(handles):
+            if other == handle:
+                break
+        else:
+            if not add:
+                return None
+            index = len(handles)
+            handles.append(handle)
+            self._selected_keys = None
+
+        if not index:
+            return code
+        return (code, index)
+
+    def get_node_key(self, node):
+        '''
+        Return node key, None if missing
+        (MObjectHandle hash code, or (hash code, index) for nodes colliding
+        with a previous node hash code)
+        '''
+        entry = self.get_node_entry(node)
+        if not entry:
+            return None
+        return self._get_key(entry[0], add=True)
+
+    def add_missing_nodes(self, nodes):
+        '''
+        Register missing nodes names, dependent caches are invalidated once
+        nodes with a matching name are created or renamed
+        '''
+        self._add_callbacks()
+        for node in nodes:
+            self.nodes.pop(node, None)
+            self.missing.add(node)
+            self._index_name(node)
+
+    def get_nodes_keys(self, nodes):
+        '''
+        Return flattened nodes keys list (see get_node_key), missing nodes,
+        and sets, are registered (see add_missing_nodes)
+        '''
+        missing = []
+        keys = []
+        for node in get_flattened_nodes(nodes, missing=missing):
+            key = self.get_node_key(node)
+            if key is not None:
+                keys.append(key)
+        if missing:
+            self.add_missing_nodes(missing)
+        return keys
+
     def is_selected(self, node):
         '''Will check if node is currently selected
         '''
-        # Get node MDagPath
-        node = self.get_node_mdagpath(node)
-        if not node:
+        key = self.get_node_key(node)
+        if key is None:
             return False
-
-        # Check if node is in selection lest
-        return self.sel.hasItem(node)
+        return key in self.get_selected_keys()
@@ -2,6 +2,7 @@
 # This file is part of "anim_picker" and covered by MIT,
 # read LICENSE.md and COPYING.md for details.
 
+import re
 import sys
 
 
@@ -12,3 +13,296 @@ def safe_code_exec(cmd, env=dict()):
         exec cmd in env
     except Exception:
         raise sys.exc_info()[0], sys.exc_info()[1], sys.exc_info()[2]
+
+
+# =============================================================================
+# Literal parser ---
+# =============================================================================
+class LiteralParseError(ValueError):
+    '''Raised when a text does not describe a valid python literal
+    '''
+
+    def __init__(self, msg, text, pos, filename=None):
+        self.pos = pos
+        self.lineno = text.count("\n", 0, pos) + 1
+        self.colno = pos - text.rfind("\n", 0, pos)
+        self.filename = filename
+        msg = "{} (line {}, column {})".format(msg, self.lineno, self.colno)
+        if filename:
+            msg = "{}: {}".format(filename, msg)
+        ValueError.__init__(self, msg)
+
+
+# One token per match, leading white spaces are skipped.
+# Groups: value separator, dictionary simple string key (prefix, body),
+# flat number sequence (opening, content, trailing comma, closing),
+# point list content, flat string list content,
+# punctuation, integer, float, string (prefix, body with quotes), name,
+# anything else (error)
+_NUMBER = r"-?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?"
+_POINT = r"\[\s*{0}\s*,\s*{0}\s*\]".format(_NUMBER)
+_SIMPLE_STRING = r"[uU]?'[^'\\\n]*'"
+_TOKEN_RE = re.compile(r"""\s*(,?)\s*(?:
+    ([uU]?)('[^'\\\n]*')\s*:
+    |([\[(])\s*((?:{0}\s*,\s*)*{0})\s*(,?)\s*([\])])
+    |\[\s*((?:{1}\s*,\s*)*{1})\s*,?\s*\]
+    |\[\s*((?:{2}\s*,\s*)*{2})\s*,?\s*\]
+    |([{{}}\[\](),:])
+    |(-?\d+)[lL]?(?![\d.eEjJ])
+    |({0})
+    |([uUbB]?[rR]?)('(?:[^'\\\n]|\\.)*'|"(?:[^"\\\n]|\\.)*")
+    |([A-Za-z_]\w*)
+    |(\S)
+    )""".format(_NUMBER, _POINT, _SIMPLE_STRING), re.VERBOSE)
+
+# Token start lookup (for error messages)
+_SPACES_RE = re.compile(r"\s*")
+
+# Flat string list item
+_SIMPLE_STRING_RE = re.compile(r"([uU]?)'([^']*)'")
+
+# Float number markers
+_FLOAT_RE = re.compile(r"[.eE]")
+
+# Integer item in flat number sequence content
+_INTEGER_ITEM_RE = re.compile(r"(?:^|,)\s*-?\d+\s*(?:,|$)")
+
+_NAMES = {"True": True, "False": False, "None": None}
+
+_CLOSING = {"[": "]", "(": ")", "{": "}"}
+
+# Dictionary pending key default (None being a valid key)
+_NO_KEY = object()
+
+
+def _decode_string(prefix, body):
+    '''Return python string for string token body (without quotes)
+    '''
+    is_unicode = "u" in prefix or "U" in prefix
+
+    # Unicode source text (from maya attributes)
+    if isinstance(body, unicode):
+        if is_unicode:
+            if "\\" not in body or "r" in prefix or "R" in prefix:
+                return body
+            return body.encode("raw_unicode_escape").decode("unicode_escape")
+
+        # Plain strings are utf-8 encoded, as with eval
+        body = body.encode("utf-8")
+
+    # Fast path, nothing to decode
+    if "\\" not in body or "r" in prefix or "R" in prefix:
+        if is_unicode:
+            return body.decode("latin-1")
+        return body
+
+    if is_unicode:
+        return body.decode("unicode_escape")
+    return body.decode("string_escape")
+
+
+def _parse_numbers(content):
+    '''Return number list for flat number sequence content
+    '''
+    parts = content.split(",")
+    if not _FLOAT_RE.search(content):
+        return map(int, parts)
+    if not _INTEGER_ITEM_RE.search(content):
+        return map(float, parts)
+    return [float(part) if _FLOAT_RE.search(part) else int(part)
+            for part in parts]
+
+
+def _raise_parse_error(msg, text, token_index, start, end, filename,
+                       group=0):
+    '''Raise LiteralParseError for specified token index
+    '''
+    for i, token in enumerate(_TOKEN_RE.finditer(text, start, end)):
+        if i == token_index:
+            if group:
+                pos = token.start(group)
+            else:
+                # Skip value separator and white spaces
+                pos = _SPACES_RE.match(text, token.end(1)).end()
+            break
+    else:
+        pos = len(text[:end].rstrip())
+    raise LiteralParseError(msg, text, pos, filename)
+
+
+def safe_literal_eval(text, start=0, end=None, filename=None):
+    '''
+    Parse text describing python literals (dicts, lists, tuples, numbers,
+    strings, booleans and None) and return the matching python object.
+    Unlike eval, no code will ever be executed, and syntax errors are
+    reported with line and column numbers.
+
+    # kwargs:
+    start, end (int): optional text slice to parse, error positions
+    remain relative to the whole text
+    filename (str): optional text source name for error messages
+    '''
+    if end is None:
+        end = len(text)
+
+    def error(msg, group=0):
+        _raise_parse_error(msg, text, index, start, end, filename, group)
+
+    # Parser stack, each entry is (container, opening_char, pending_key)
+    stack = []
+    container = None
+    opening = None
+    key = _NO_KEY
+
+    # What the next token may be
+    # 0: value or closing, 1: value, 2: separator or closing, 3: colon
+    expect = 1
+
+    done = False
+    result = None
+    index = -1
+    for (separator, key_prefix, key_string, seq_open, seq_content,
+         seq_comma, seq_close, points, strings, char, integer, number,
+         prefix, string, name, other) in _TOKEN_RE.findall(text, start, end):
+        index += 1
+
+        # Guard against trailing data
+        if done:
+            error("unexpected trailing data", group=1 if separator else 0)
+
+        # Value separator, parsed along with next token
+        if separator:
+            if expect != 2:
+                error("unexpected ','", group=1)
+            expect = 0
+
+        # Dictionary simple key, with key/value separator
+        if key_string:
+            if opening != "{" or expect > 1 or key is not _NO_KEY:
+                error("unexpected dictionary key")
+            key = _decode_string(key_prefix, key_string[1:-1])
+            expect = 1
+            continue
+
+        # Punctuation
+        if char:
+            # Value separator
+            if char == ",":
+                if expect != 2:
+                    error("unexpected ','")
+                expect = 0
+                continue
+
+            # Dictionary key/value separator
+            if char == ":":
+                if expect != 3:
+                    error("unexpected ':'")
+                expect = 1
+                continue
+
+            # Container opening
+            if char in _CLOSING:
+                if expect > 1:
+                    error("unexpected '{}'".format(char))
+                stack.append((container, opening, key))
+                container = {} if char == "{" else []
+                opening = char
+                key = _NO_KEY
+                expect = 0
+                continue
+
+            # Container closing
+            if (not opening or
+                    char != _CLOSING[opening] or
+                    expect not in (0, 2)):
+                error("unexpected '{}'".format(char))
+            value = container
+            if opening == "(":
+                # Parenthesized value without trailing comma
+                if expect == 2 and len(value) == 1:
+                    value = value[0]
+                else:
+                    value = tuple(value)
+            container, opening, key = stack.pop()
+
+        # Values
+        else:
+            if expect > 1:
+                error("unexpected value")
+
+            # Flat number sequence (handles, positions, colors)
+            if seq_open:
+                if seq_close != _CLOSING[seq_open]:
+                    error("unexpected '{}'".format(seq_close), group=7)
+                value = _parse_numbers(seq_content)
+                if seq_open == "(":
+                    # Parenthesized value without trailing comma
+                    if len(value) == 1 and not seq_comma:
+                        value = value[0]
+                    else:
+                        value = tuple(value)
+
+            # Point list (handles), parsed as a single number sequence
+            elif points:
+                values = iter(_parse_numbers(
+                    points.replace("[", "").replace("]", "")))
+                value = map(list, zip(values, values))
+
+            # Flat string list (controls)
+            elif strings:
+                value = [_decode_string(*item)
+                         for item in _SIMPLE_STRING_RE.findall(strings)]
+
+            # Strings
+            elif string:
+                value = _decode_string(prefix, string[1:-1])
+
+            # Integers
+            elif integer:
+                value = int(integer)
+
+            # Floats
+            elif number:
+                value = float(number)
+
+            # Names
+            elif name:
+                if name not in _NAMES:
+                    error("invalid name '{}'".format(name))
+                value = _NAMES[name]
+
+            # Anything else
+            else:
+                error("invalid character '{}'".format(other))
+
+        # Store value
+        if container is None:
+            result = value
+            done = True
+        elif opening != "{":
+            container.append(value)
+        elif key is _NO_KEY:
+            try:
+                hash(value)
+            except TypeError:
+                error("unhashable dictionary key")
+            key = value
+            expect = 3
+            continue
+        else:
+            container[key] = value
+            key = _NO_KEY
+        expect = 2
+
+    # Check for incomplete data
+    if not done:
+        pos = len(text[:end].rstrip())
+        if stack:
+            msg = "unexpected end of data, missing '{}'"
+            raise LiteralParseError(msg.format(_CLOSING[opening]),
+                                    text,
+                                    pos,
+                                    filename)
+        raise LiteralParseError("no data found", text, pos, filename)
+
+    return result
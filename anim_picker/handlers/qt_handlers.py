@@ -44,6 +44,16 @@ def unwrap_instance(qt_object):
         return long(shiboken.getCppPointer(qt_object)[0])
 
 
+def is_valid(qt_object):
+    '''Return False if qt class instance underlying object was deleted
+    '''
+    if "sip" in globals():
+        return not sip.isdeleted(qt_object)
+    elif "shiboken" in globals():
+        return shiboken.isValid(qt_object)
+    return True
+
+
 def get_maya_window():
     '''Get the maya main window as a QMainWindow instance
     '''
@@ -53,3 +63,92 @@ def get_maya_window():
     except Exception:
         #    fails at import on maya launch since ui isn't up yet
         return None
+
+
+# =============================================================================
+# Events ---
+# =============================================================================
+class EventCoalescer(QtCore.QObject):
+    '''
+    Collapse event bursts into a single callback call.
+    Posted events are processed once no new event was received for delay
+    (ms, 0 for next event loop idle tick), or after max_latency (ms) since
+    the first pending event, if events keep coming.
+    Received and processed events counters show saved work.
+    '''
+    __DEFAULT_DELAY__ = 0
+    __DEFAULT_MAX_LATENCY__ = 100
+
+    def __init__(self, callback, delay=None, max_latency=None, parent=None):
+        QtCore.QObject.__init__(self, parent)
+
+        self.callback = callback
+        self.pending = False
+
+        # Counters
+        self.received = 0
+        self.processed = 0
+
+        # Idle/debounce timer
+        self.delay_timer = QtCore.QTimer(self)
+        self.delay_timer.setSingleShot(True)
+        self.delay_timer.timeout.connect(self.flush)
+
+        # Max latency timer
+        self.latency_timer = QtCore.QTimer(self)
+        self.latency_timer.setSingleShot(True)
+        self.latency_timer.timeout.connect(self.flush)
+
+        self.set_delay(delay)
+        self.set_max_latency(max_latency)
+
+    def set_delay(self, delay=None):
+        if delay is None:
+            delay = self.__DEFAULT_DELAY__
+        self.delay_timer.setInterval(delay)
+
+    def set_max_latency(self, max_latency=None):
+        if max_latency is None:
+            max_latency = self.__DEFAULT_MAX_LATENCY__
+        self.latency_timer.setInterval(max_latency)
+
+    def post(self, *args):
+        '''Register event, callback will be called on flush
+        '''
+        self.received += 1
+        self.pending = True
+
+        # (Re)start idle timer
+        self.delay_timer.start()
+
+        # Start latency timer on first pending event
+        if not self.latency_timer.isActive():
+            self.latency_timer.start()
+
+    def flush(self):
+        '''Process pending events now
+        '''
+        self.delay_timer.stop()
+        self.latency_timer.stop()
+        if not self.pending:
+            return
+
+        self.pending = False
+        self.processed += 1
+        self.callback()
+
+    def cancel(self):
+        '''Drop pending events
+        '''
+        self.delay_timer.stop()
+        self.latency_timer.stop()
+        self.pending = False
+
+    def get_counters(self):
+        '''Return received and processed events counts
+        '''
+        return self.received, self.processed
+
+    def reset_counters(self):
+        self.received = 0
+        self.processed = 0
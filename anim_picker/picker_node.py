@@ -5,20 +5,22 @@
 import sys
 import os
 from maya import cmds
+from maya import OpenMaya
 import anim_picker
 from handlers import maya_handlers
 from handlers import file_handlers
+from handlers import python_handlers
+from handlers import binary_handlers
 
 
 def get_nodes():
     '''Return data nodes found in scene
     '''
     data_nodes = []
-    for maya_node in cmds.ls("*.{}".format(DataNode.__TAG__),
-                             o=True,
-                             r=True) or []:
-        data_node = DataNode(maya_node)
-        data_node.read_data()
+    for data_node in __REGISTRY__.get_data_nodes():
+        # Data will only be read again on next access
+        if data_node.is_outdated():
+            data_node.unload()
         data_nodes.append(data_node)
 
     data_nodes.sort()
@@ -43,9 +45,9 @@ def get_node_for_object(item):
 
     # Parse namespaces
     for namespace in namespaces:
-        for data_node in cmds.ls("{}*.{}".format(namespace, DataNode.__TAG__),
-                                 o=True) or []:
-            data_node = DataNode(data_node)
+        for data_node in __REGISTRY__.get_data_nodes(namespace=namespace):
+            if data_node.is_outdated():
+                data_node.unload()
             if data_node.countains(item.replace(namespace[1:], '')):
                 return data_node
     return None
@@ -56,7 +58,12 @@ def get_node_for_object(item):
 # =============================================================================
 
 
-class DataNode():
+class DataNode(object):
+    '''
+    Picker data node, data is only read (and parsed) on first access
+    to data/get_data(), metadata accessors (name, namespace, version,
+    file path) will only query the maya node attributes.
+    '''
     # Pipeline
     __NODE__ = "PICKER_DATAS"
     __TAG__ = "picker_datas_node"
@@ -71,9 +78,15 @@ class DataNode():
         if not name:
             self.name = self.__NODE__
 
-        self.data = {}
-        if cmds.objExists(self.name):
-            self.data = self.read_data()
+        # Not loaded yet
+        self._data = None
+
+        # Data file key (path, modification time, size) data was read from
+        self._file_key = None
+
+        # Control name: [(tab index, item index), ...]
+        self._control_index = None
+        self._control_index_generation = None
 
     def __repr__(self):
         return "{}.{}(u'{}')".format(self.__class__.__module__,
@@ -83,7 +96,7 @@ class DataNode():
     def __eq__(self, other):
         '''Compare datas
         '''
-        return self.data == other
+        return self.get_data() == other
 
     def __lt__(self, other):
         '''Override for "sort" function
@@ -192,34 +205,130 @@ class DataNode():
         '''
         return self._get_attr(self.__FILE_ATTR__)
 
+    def get_version(self):
+        '''Return stored data version
+        '''
+        return self._get_attr(self.__VERSION_ATTR__)
+
     # ==========================================================================
     # Set attributes
-    def get_data(self):
+    @property
+    def data(self):
+        '''Picker data, read on first access
+        '''
+        if self._data is None:
+            if self.exists():
+                self.read_data()
+            else:
+                self._data = {}
+        return self._data
+
+    @data.setter
+    def data(self, data):
+        self._data = data
+        self._file_key = None
+        self._control_index = None
+
+    def is_loaded(self):
+        '''Return True if data was already read
+        '''
+        return self._data is not None
+
+    def is_outdated(self):
+        '''Return True if data file changed since data was read
+        '''
+        if not self._file_key:
+            return False
+        file_path = self.get_file_path()
+        if not (file_path and os.path.isfile(file_path)):
+            return True
+        return file_handlers.DataCache.get_file_key(file_path) != \
+            self._file_key
+
+    def unload(self):
+        '''Drop data, to read it again on next access
+        '''
+        self._data = None
+        self._file_key = None
+        self._control_index = None
+
+    def get_data(self, load_tabs=True):
+        '''Return picker data
+        (load_tabs: if False, lazy tabs content won't be loaded)
+        '''
+        if load_tabs:
+            for index in range(self.get_tab_count()):
+                self.get_tab_data(index)
         return self.data
 
     def set_data(self, data):
         self.data = data
 
+    def get_tab_count(self):
+        '''Return picker tabs count
+        '''
+        if not self.data:
+            return 0
+        return len(self.data.get("tabs", []))
+
+    def get_tab_name(self, index):
+        '''Return tab name for index
+        '''
+        return self.data["tabs"][index].get("name", "default")
+
+    def get_tab_data(self, index):
+        '''
+        Return tab content data for index
+        (lazy tab content from binary files will be decoded on first access)
+        '''
+        tab_data = self.data["tabs"][index]
+        content = tab_data.get("data", None)
+        if isinstance(content, binary_handlers.LazyValue):
+            content = content.load()
+            tab_data["data"] = content
+        return content
+
+    def get_tab_data_loader(self, index):
+        '''
+        Return callable returning tab content data for index, bound to
+        current tab content (node data can be read again before the call,
+        lazy tab content will be decoded on call)
+        '''
+        content = self.data["tabs"][index].get("data", None)
+        if isinstance(content, binary_handlers.LazyValue):
+            return content.load
+        return lambda: content
+
     def write_data(self,
                    data=None,
                    to_node=True,
                    to_file=False,
-                   file_path=None):
-        '''Write data to data node and data file
+                   file_path=None,
+                   binary=None):
+        '''Write data to data node and data file, return True on success
+        (binary: use binary file format, None will keep file current format)
         '''
         if not data:
-            data = self.data
+            data = self.get_data()
 
-        # Write data to file
+        # Write data to file (write_data_file will warn on failure,
+        # node is left untouched)
         if to_file:
-            file_handlers.write_data_file(file_path=file_path,
-                                          data=data)
+            if not file_handlers.write_data_file(file_path=file_path,
+                                                 data=data,
+                                                 binary=binary):
+                return False
             self._set_str_attr(self.__FILE_ATTR__, value=file_path)
 
         # Write data to node attribute
         if to_node:
             self._set_str_attr(self.__DATAS_ATTR__, value=data)
 
+        # Other instances for this node will have to read data again
+        __REGISTRY__.unload_data_node(self)
+
+        return True
+
     def read_data_from_node(self):
         '''Read data from data node or data file
         '''
@@ -229,7 +338,8 @@ class DataNode():
         # Get data from attribute
         attr_data = self._get_attr(self.__DATAS_ATTR__)
         if attr_data:
-            data = eval(attr_data)
+            attr = "{}.{}".format(self.name, self.__DATAS_ATTR__)
+            data = python_handlers.safe_literal_eval(attr_data, filename=attr)
 
         return data
 
@@ -242,12 +352,17 @@ class DataNode():
         if not os.path.exists(file_path):
             return
 
-        return file_handlers.read_data_file(file_path)
+        self._file_key = file_handlers.DataCache.get_file_key(file_path)
+        return file_handlers.read_data_file(file_path, lazy=True)
 
     def read_data(self, from_file=True):
-        '''Read picker data
+        '''
+        Read picker data
+        (tabs content from binary files will only be decoded on access,
+        see get_tab_data)
         '''
         self._assert_exists()
+        self.unload()
 
         # Init data dict
         data = {}
@@ -258,22 +373,71 @@ class DataNode():
 
         # Read data from node
         if not data:
+            self._file_key = None
             data = self.read_data_from_node()
 
-        self.data = data
+        self._data = data
         return data
 
+    # =========================================================================
+    # Controls
+    def get_control_index(self):
+        '''
+        Return control name to [(tab index, item index), ...] dictionary,
+        for all tabs picker items (object sets are flattened).
+        Control names are stored without node namespace, index is built on
+        first call, and will be reset with data or object sets content.
+        '''
+        generation = maya_handlers.__SET_CACHE__.generation
+        if (self._control_index is not None and
+                self._control_index_generation == generation):
+            return self._control_index
+
+        namespace = self.get_namespace()
+        prefix = "{}:".format(namespace) if namespace else ""
+
+        index = {}
+        flattened = {}
+        for tab_index in range(self.get_tab_count()):
+            tab_data = self.get_tab_data(tab_index) or {}
+            for item_index, item_data in enumerate(tab_data.get("items", [])):
+                for control in item_data.get("controls", []):
+                    # Flatten object sets once per control
+                    nodes = flattened.get(control)
+                    if nodes is None:
+                        nodes = set([control])
+                        for node in maya_handlers.get_flattened_nodes(
+                                [prefix + control]):
+                            if prefix and node.startswith(prefix):
+                                node = node[len(prefix):]
+                            nodes.add(node)
+                        flattened[control] = nodes
+
+                    for node in nodes:
+                        entries = index.setdefault(node, [])
+                        if entries and entries[-1] == (tab_index, item_index):
+                            continue
+                        entries.append((tab_index, item_index))
+
+        self._control_index = index
+        self._control_index_generation = maya_handlers.__SET_CACHE__.generation
+        return index
+
+    def find_items_for_control(self, control):
+        '''
+        Return [(tab index, item index), ...] list of picker items related
+        to control (name with or without node namespace)
+        '''
+        namespace = self.get_namespace()
+        if namespace and control.startswith("{}:".format(namespace)):
+            control = control[len(namespace) + 1:]
+        return list(self.get_control_index().get(control, []))
+
     def countains(self, node):
         '''Will return True if data_node contains selected node in
         related controls data
         '''
-        for tab_data in self.data["tabs"]:
-            for item_data in tab_data[1]:
-                controls = item_data.get("controls", {})
-                controls = maya_handlers.get_flattened_nodes(controls)
-                if controls.count(node):
-                    return True
-        return False
+        return bool(self.find_items_for_control(node))
 
     def set_version(self, version=None):
         '''Set node data version attribute
@@ -284,3 +448,242 @@ class DataNode():
         attrPlug = "{}.{}".format(self.name, self.__VERSION_ATTR__)
         cmds.setAttr(attrPlug, k=False, l=False)
         cmds.setAttr(attrPlug, unicode(version), l=True, type="string")
+
+
+# =============================================================================
+# Registry
+# =============================================================================
+class NodeRegistry(object):
+    '''
+    Scene data nodes registry.
+    Tagged nodes are found with a single full scene scan, then tracked
+    with maya callbacks (node added/removed, renamed), the full scan will
+    only run again after scene open/new, reference load or import.
+
+    Nodes are stored as MObjectHandles, so names always match current
+    node names. Added nodes are only checked for the data node tag on
+    next query (tag attribute is added after node creation).
+
+    # kwargs:
+    cmds_module, api_module: maya.cmds and maya.OpenMaya like backends
+    (for tests)
+    '''
+    # Picker data nodes type (callbacks filter)
+    __NODE_TYPE__ = "transform"
+
+    # Pending added nodes count over which a full scan will be used
+    __MAX_PENDING__ = 1000
+
+    def __init__(self, cmds_module=None, api_module=None):
+        self.cmds = cmds_module or cmds
+        self.api = api_module or OpenMaya
+
+        self.valid = False
+        self.callback_ids = []
+
+        # Tracked nodes (MObjectHandle hash code: MObjectHandle)
+        self.handles = {}
+
+        # Added nodes, to check on next query
+        self.pending = []
+
+        # Names cache (namespace: [(node name, handle hash code), ...])
+        self.names = None
+
+        # Shared DataNode instances (MObjectHandle hash code: DataNode)
+        self.data_nodes = {}
+
+    # =========================================================================
+    # Callbacks
+    def add_callbacks(self):
+        '''Register maya callbacks to keep registry up to date
+        '''
+        if self.callback_ids:
+            return
+        api = self.api
+
+        self.callback_ids.append(
+            api.MDGMessage.addNodeAddedCallback(self._node_added_cb,
+                                                self.__NODE_TYPE__))
+        self.callback_ids.append(
+            api.MDGMessage.addNodeRemovedCallback(self._node_removed_cb,
+                                                  self.__NODE_TYPE__))
+        self.callback_ids.append(
+            api.MNodeMessage.addNameChangedCallback(api.MObject(),
+                                                    self._name_changed_cb))
+
+        for message in [api.MSceneMessage.kAfterOpen,
+                        api.MSceneMessage.kAfterNew,
+                        api.MSceneMessage.kAfterImport,
+                        api.MSceneMessage.kAfterCreateReference,
+                        api.MSceneMessage.kAfterLoadReference]:
+            self.callback_ids.append(
+                api.MSceneMessage.addCallback(message, self._scene_changed_cb))
+
+    def remove_callbacks(self):
+        '''Remove registered maya callbacks (registry will be invalidated)
+        '''
+        for callback_id in self.callback_ids:
+            self.api.MMessage.removeCallback(callback_id)
+        self.callback_ids = []
+        self.invalidate()
+
+    def _node_added_cb(self, mobject, *args):
+        if not self.valid:
+            return
+
+        # Too many new nodes, fall back to full scan
+        if len(self.pending) >= self.__MAX_PENDING__:
+            self.invalidate()
+            return
+
+        self.pending.append(self.api.MObjectHandle(mobject))
+
+    def _node_removed_cb(self, mobject, *args):
+        key = self.api.MObjectHandle(mobject).hashCode()
+        if self.handles.pop(key, None):
+            self.data_nodes.pop(key, None)
+            self.names = None
+
+    def _name_changed_cb(self, mobject, *args):
+        key = self.api.MObjectHandle(mobject).hashCode()
+        if key in self.handles:
+            self.data_nodes.pop(key, None)
+            self.names = None
+
+    def _scene_changed_cb(self, *args):
+        self.invalidate()
+
+    # =========================================================================
+    # Nodes
+    def invalidate(self):
+        '''Clear registry, scene will be scanned again on next query
+        '''
+        self.valid = False
+        self.handles = {}
+        self.pending = []
+        self.names = None
+        self.data_nodes = {}
+
+    def _add_node(self, mobject):
+        handle = self.api.MObjectHandle(mobject)
+        self.handles[handle.hashCode()] = handle
+
+    def scan(self):
+        '''Run full scene scan for data nodes
+        '''
+        self.add_callbacks()
+        self.invalidate()
+
+        nodes = self.cmds.ls("*.{}".format(DataNode.__TAG__),
+                             o=True,
+                             r=True) or []
+        sel = self.api.MSelectionList()
+        for node in nodes:
+            sel.add(node)
+        for i in range(sel.length()):
+            mobject = self.api.MObject()
+            sel.getDependNode(i, mobject)
+            self._add_node(mobject)
+
+        self.valid = True
+
+    def update(self):
+        '''Update registry (full scan if needed, or check added nodes)
+        '''
+        if not self.valid:
+            self.scan()
+            return
+
+        # Check added nodes for data node tag
+        pending = self.pending
+        self.pending = []
+        for handle in pending:
+            if not handle.isValid():
+                continue
+            mobject = handle.object()
+            node_fn = self.api.MFnDependencyNode(mobject)
+            if not node_fn.hasAttribute(DataNode.__TAG__):
+                continue
+            self._add_node(mobject)
+            self.names = None
+
+    def get_node_name(self, mobject):
+        '''Return node name (shortest unique path for dag nodes)
+        '''
+        if mobject.hasFn(self.api.MFn.kDagNode):
+            return self.api.MDagPath.getAPathTo(mobject).partialPathName()
+        return self.api.MFnDependencyNode(mobject).name()
+
+    def _get_names_cache(self):
+        '''Return names cache, by namespace
+        '''
+        self.update()
+        if self.names is not None:
+            return self.names
+
+        names = {}
+        for key, handle in self.handles.items():
+            # Deleted nodes (undo queue)
+            if not handle.isValid():
+                continue
+
+            name = self.get_node_name(handle.object())
+            namespace = name.rsplit("|", 1)[-1].rsplit(":", 1)
+            if len(namespace) == 2:
+                namespace = ":{}:".format(namespace[0])
+            else:
+                namespace = ":"
+            names.setdefault(namespace, []).append((name, key))
+
+        self.names = names
+        return names
+
+    def _get_entries(self, namespace=None):
+        names = self._get_names_cache()
+        if namespace is not None:
+            return names.get(namespace, [])
+
+        results = []
+        for namespace_names in names.values():
+            results.extend(namespace_names)
+        return results
+
+    def get_names(self, namespace=None):
+        '''
+        Return data node names
+        (namespace: filter names with namespace, ":" for root namespace,
+        ":name:" otherwise, nested namespaces are not included)
+        '''
+        return [name for name, key in self._get_entries(namespace)]
+
+    def get_data_nodes(self, namespace=None):
+        '''
+        Return shared DataNode instances for data nodes, so loaded data
+        and controls index are reused between queries
+        (namespace: see get_names)
+        '''
+        data_nodes = []
+        for name, key in self._get_entries(namespace):
+            # Reuse shared instance only if still matching current name
+            data_node = self.data_nodes.get(key)
+            if data_node is None or not data_node.name == name:
+                data_node = DataNode(name)
+                self.data_nodes[key] = data_node
+            data_nodes.append(data_node)
+        return data_nodes
+
+    def unload_data_node(self, data_node):
+        '''Unload shared instances data for data_node, if it is not one
+        '''
+        for shared_node in self.data_nodes.values():
+            if shared_node is data_node or shared_node.name != data_node.name:
+                continue
+            shared_node.unload()
+
+
+# Remove previous registry callbacks on module reload
+if "__REGISTRY__" in globals():
+    __REGISTRY__.remove_callbacks()
+
+__REGISTRY__ = NodeRegistry()